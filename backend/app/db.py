@@ -1,29 +1,225 @@
+import asyncio
+import logging
 import os
+import re
+import time
+from uuid import uuid4
 from dotenv import load_dotenv
-from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker
+from sqlalchemy import text
+from sqlalchemy.exc import DBAPIError, TimeoutError as PoolTimeout
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine, async_sessionmaker
+from sqlalchemy.pool import AsyncAdaptedQueuePool
 
 load_dotenv()
 
-DATABASE_URL = os.getenv("DATABASE_URL", "")
+logger = logging.getLogger(__name__)
 
-# Auto-convert postgres:// or postgresql:// to async driver
-if DATABASE_URL.startswith("postgres://"):
-    DATABASE_URL = DATABASE_URL.replace("postgres://", "postgresql+asyncpg://", 1)
-elif DATABASE_URL.startswith("postgresql://"):
-    DATABASE_URL = DATABASE_URL.replace("postgresql://", "postgresql+asyncpg://", 1)
 
-# Remove params not supported by asyncpg
-import re
-DATABASE_URL = re.sub(r'[&?](channel_binding|sslmode)=[^&]*', '', DATABASE_URL)
-# Clean up trailing ? if all params were stripped
-DATABASE_URL = DATABASE_URL.rstrip('?')
+def _async_url(url: str) -> str:
+    # Auto-convert postgres:// or postgresql:// to async driver
+    if url.startswith("postgres://"):
+        url = url.replace("postgres://", "postgresql+asyncpg://", 1)
+    elif url.startswith("postgresql://"):
+        url = url.replace("postgresql://", "postgresql+asyncpg://", 1)
+
+    # Remove params not supported by asyncpg
+    url = re.sub(r'[&?](channel_binding|sslmode)=[^&]*', '', url)
+    # Clean up trailing ? if all params were stripped
+    return url.rstrip('?')
+
+
+DATABASE_URL = _async_url(os.getenv("DATABASE_URL", ""))
+DATABASE_READ_URL = _async_url(os.getenv("DATABASE_READ_URL", ""))
+READ_MAX_LAG_SECONDS = float(os.getenv("DB_READ_MAX_LAG_SECONDS", "5"))
+READ_CHECK_SECONDS = float(os.getenv("DB_READ_CHECK_SECONDS", "10"))
+
+POOL_SIZE = int(os.getenv("DB_POOL_SIZE", "5"))
+MAX_OVERFLOW = int(os.getenv("DB_MAX_OVERFLOW", "10"))
+POOL_TIMEOUT = float(os.getenv("DB_POOL_TIMEOUT", "30"))
+POOL_RECYCLE = int(os.getenv("DB_POOL_RECYCLE", "1800"))
+POOL_PRE_PING = os.getenv("DB_POOL_PRE_PING", "").lower() in ("1", "true", "yes")
+# PgBouncer in transaction mode hands each transaction a different server connection,
+# so asyncpg's named prepared statements can't be reused across them
+PGBOUNCER = os.getenv("DB_PGBOUNCER", "").lower() in ("1", "true", "yes")
+
+
+class PoolStats:
+    """Connection checkout counters — how long requests wait for a connection and how often they give up."""
+
+    def __init__(self):
+        self.checkouts = 0
+        self.timeouts = 0
+        self.wait_total = 0.0
+        self.wait_max = 0.0
+        self.overflow_peak = 0
+
+    def record(self, wait: float, overflow: int):
+        self.checkouts += 1
+        self.wait_total += wait
+        self.wait_max = max(self.wait_max, wait)
+        self.overflow_peak = max(self.overflow_peak, overflow)
+
+
+class TimedQueuePool(AsyncAdaptedQueuePool):
+    """The default async pool, timing every checkout into `stats`."""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.stats = PoolStats()
+
+    def _do_get(self):
+        start = time.perf_counter()
+        try:
+            conn = super()._do_get()
+        except PoolTimeout:
+            self.stats.timeouts += 1
+            raise
+        self.stats.record(time.perf_counter() - start, max(self.overflow(), 0))
+        return conn
+
+    def recreate(self):
+        pool = super().recreate()
+        pool.stats = self.stats
+        return pool
+
+
+def _connect_args(url: str) -> dict:
+    args = {}
+    # Use SSL for cloud providers
+    if "neon.tech" in url or "supabase" in url:
+        args["ssl"] = "require"
+    if PGBOUNCER:
+        args["statement_cache_size"] = 0
+        args["prepared_statement_cache_size"] = 0
+        args["prepared_statement_name_func"] = lambda: f"__asyncpg_{uuid4()}__"
+    return args
+
+
+def _create_engine(url: str):
+    return create_async_engine(
+        url, echo=False, connect_args=_connect_args(url), poolclass=TimedQueuePool,
+        pool_size=POOL_SIZE, max_overflow=MAX_OVERFLOW, pool_timeout=POOL_TIMEOUT,
+        pool_recycle=POOL_RECYCLE, pool_pre_ping=POOL_PRE_PING,
+    )
+
+
+def pool_metrics(engine) -> dict:
+    pool = engine.pool
+    stats = pool.stats
+    return {
+        "size": pool.size(),
+        "checked_out": pool.checkedout(),
+        "idle": pool.checkedin(),
+        "overflow": max(pool.overflow(), 0),
+        "max_overflow": MAX_OVERFLOW,
+        "overflow_peak": stats.overflow_peak,
+        "checkouts": stats.checkouts,
+        "timeouts": stats.timeouts,
+        "wait_avg_ms": round(1000 * stats.wait_total / stats.checkouts, 3) if stats.checkouts else 0.0,
+        "wait_max_ms": round(1000 * stats.wait_max, 3),
+        "pgbouncer": PGBOUNCER,
+    }
+
 
-# Use SSL for cloud providers
-_use_ssl = "neon.tech" in DATABASE_URL or "supabase" in DATABASE_URL
-engine = create_async_engine(DATABASE_URL, echo=False, connect_args={"ssl": "require"} if _use_ssl else {})
+# Without DATABASE_URL (snapshot-only nodes) sessions are unbound and fail on first use
+engine = _create_engine(DATABASE_URL) if DATABASE_URL else None
 async_session = async_sessionmaker(engine, expire_on_commit=False)
 
 
+class ReplicaSession(AsyncSession):
+    """Session on the replica that falls back to the primary: a read failing on the replica
+    is retried once against the primary, and a connection error marks the replica down."""
+
+    async def _failover(self, method, *args, **kwargs):
+        try:
+            return await method(self, *args, **kwargs)
+        except (OSError, DBAPIError) as e:
+            if engine is None or self.bind is engine:
+                raise
+            if isinstance(e, OSError) or e.connection_invalidated:
+                replica.mark_down()
+            logger.warning(f"Replica read failed — retrying on the primary: {e}")
+            await self.rollback()
+            self.bind, self.sync_session.bind = engine, engine.sync_engine
+            return await method(self, *args, **kwargs)
+
+    async def execute(self, *args, **kwargs):
+        return await self._failover(AsyncSession.execute, *args, **kwargs)
+
+    async def scalar(self, *args, **kwargs):
+        return await self._failover(AsyncSession.scalar, *args, **kwargs)
+
+    async def scalars(self, *args, **kwargs):
+        return await self._failover(AsyncSession.scalars, *args, **kwargs)
+
+    async def get(self, *args, **kwargs):
+        return await self._failover(AsyncSession.get, *args, **kwargs)
+
+
+read_engine = _create_engine(DATABASE_READ_URL) if DATABASE_READ_URL else None
+read_session = async_sessionmaker(read_engine, class_=ReplicaSession, expire_on_commit=False) if read_engine else None
+
+
+class ReplicaHealth:
+    """Whether reads may go to the replica: reachable and no further behind than max_lag.
+
+    Checked at most every check_seconds; a connection error on a replica session
+    marks it down until the next check.
+    """
+
+    def __init__(self, max_lag: float = READ_MAX_LAG_SECONDS, check_seconds: float = READ_CHECK_SECONDS):
+        self.max_lag = max_lag
+        self.check_seconds = check_seconds
+        self.healthy = False
+        self.lag: float | None = None
+        self._checked_at: float | None = None
+        self._lock = asyncio.Lock()
+
+    def mark_down(self):
+        self.healthy = False
+        self._checked_at = time.monotonic()
+
+    async def ok(self) -> bool:
+        if self._checked_at is not None and time.monotonic() - self._checked_at < self.check_seconds:
+            return self.healthy
+        async with self._lock:
+            if self._checked_at is None or time.monotonic() - self._checked_at >= self.check_seconds:
+                await self._check()
+        return self.healthy
+
+    async def _check(self):
+        try:
+            async with read_engine.connect() as conn:
+                # Caught up when everything received has been replayed; NULL when it isn't a standby
+                self.lag = (await conn.execute(text(
+                    "SELECT CASE WHEN pg_last_wal_receive_lsn() = pg_last_wal_replay_lsn() THEN 0 "
+                    "ELSE EXTRACT(EPOCH FROM now() - pg_last_xact_replay_timestamp()) END"
+                ))).scalar() or 0.0
+            self.healthy = self.lag <= self.max_lag
+            if not self.healthy:
+                logger.warning(f"Read replica {self.lag:.1f}s behind — reading from the primary")
+        except (OSError, DBAPIError) as e:
+            self.healthy, self.lag = False, None
+            logger.warning(f"Read replica unreachable — reading from the primary: {e}")
+        self._checked_at = time.monotonic()
+
+
+replica = ReplicaHealth()
+
+
 async def get_db():
     async with async_session() as session:
         yield session
+
+
+async def get_read_db():
+    """Session for read-only work: the replica when configured and healthy, else the primary.
+
+    A replica session retries a failed read once on the primary (see ReplicaSession).
+    """
+    if read_session is None or not await replica.ok():
+        async with async_session() as session:
+            yield session
+        return
+    async with read_session() as session:
+        yield session
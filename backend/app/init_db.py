@@ -34,16 +34,20 @@ def create_database():
     conn.close()
 
 
+def sync_url() -> str:
+    url = os.getenv("DATABASE_URL", "").replace("+asyncpg", "+psycopg2")
+    return url or f"postgresql+psycopg2://{DB_USER}:{DB_PASS}@{DB_HOST}:{DB_PORT}/{DB_NAME}"
+
+
 def create_tables():
-    sync_url = os.getenv("DATABASE_URL", "").replace("+asyncpg", "+psycopg2")
-    if not sync_url:
-        sync_url = f"postgresql+psycopg2://{DB_USER}:{DB_PASS}@{DB_HOST}:{DB_PORT}/{DB_NAME}"
-    engine = create_engine(sync_url)
+    engine = create_engine(sync_url())
     Base.metadata.create_all(engine)
     engine.dispose()
     print("Tables created successfully")
 
 
 if __name__ == "__main__":
+    from app import migrate
     create_database()
     create_tables()
+    migrate.run()
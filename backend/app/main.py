@@ -1,9 +1,55 @@
 import os
+import asyncio
+import logging
+from contextlib import asynccontextmanager
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
-from app.routers import admin, game, users, leaderboard, auth, issues
+from app.db import DATABASE_URL, async_session
+from app.routers import admin, game, users, leaderboard, auth, issues, metrics
+from app.services.challenge_sampler import sampler
+from app.services import daily_service, leaderboard_service, score_service
+from app.services.title_index import index as title_index
+from app.services.autocomplete import index as autocomplete_index
+from app.snapshot import snapshot
 
-app = FastAPI(title="Lyricle API", version="0.1.0")
+logger = logging.getLogger(__name__)
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    if snapshot is not None:
+        # Gameplay reads come from the snapshot file; scores go to the database if there is one, else a spool
+        await title_index.load_rows(snapshot.variants())
+        autocomplete_index.load_rows(snapshot.songs())
+        if DATABASE_URL:
+            score_service.buffer.start(async_session)
+        else:
+            score_service.spool.open()
+        logger.info(f"Serving snapshot {snapshot.path} exported at {snapshot.exported_at}")
+        yield
+        await score_service.buffer.stop()
+        score_service.spool.close()
+        return
+
+    # Warm in-memory structures one at a time, each in its own session, so one failure
+    # doesn't leave the rest cold; the indexes also build lazily if the DB isn't reachable yet
+    for name, warm in (("Challenge sampler", sampler.rebuild), ("Title index", title_index.load),
+                       ("Autocomplete index", autocomplete_index.load),
+                       ("Leaderboard totals", leaderboard_service.ensure_totals)):
+        try:
+            async with async_session() as db:
+                await warm(db)
+        except Exception as e:
+            logger.warning(f"{name} warm-up failed: {e}")
+    daily_task = asyncio.create_task(daily_service.prepare_daily(async_session))
+    if score_service.WRITE_BEHIND:
+        score_service.buffer.start(async_session)
+    yield
+    daily_task.cancel()
+    await score_service.buffer.stop()
+
+
+app = FastAPI(title="Lyricle API", version="0.1.0", lifespan=lifespan)
 
 origins = os.getenv("CORS_ORIGINS", "http://localhost:5173").split(",")
 
@@ -21,6 +67,7 @@ app.include_router(users.router)
 app.include_router(leaderboard.router)
 app.include_router(auth.router)
 app.include_router(issues.router)
+app.include_router(metrics.router)
 
 
 @app.get("/health")
@@ -0,0 +1,149 @@
+"""Apply the numbered SQL migrations in sql/ that haven't run yet.
+
+Usage: python -m app.migrate             # apply pending migrations
+       python -m app.migrate --status    # list applied and pending versions
+       python -m app.migrate --explain   # fail if a hot-path query isn't served by its index
+Uses the same DATABASE_URL / DB_* settings as init_db.
+"""
+
+import json
+import re
+import sys
+from pathlib import Path
+from sqlalchemy import create_engine, text
+from app.init_db import sync_url
+
+SQL_DIR = Path(__file__).resolve().parent.parent / "sql"
+_MIGRATION = re.compile(r"^(\d+)_(\w+)\.sql$")
+_LOCK_ID = 7_340_017  # pg_advisory_lock key, so two deploys don't migrate at once
+
+
+def migrations() -> list[tuple[int, str, Path]]:
+    found = []
+    for path in SQL_DIR.iterdir():
+        if m := _MIGRATION.match(path.name):
+            found.append((int(m.group(1)), m.group(2), path))
+    return sorted(found)
+
+
+def _applied(conn) -> set[int]:
+    conn.execute(text(
+        "CREATE TABLE IF NOT EXISTS schema_migrations ("
+        "version INTEGER PRIMARY KEY, name TEXT NOT NULL, applied_at TIMESTAMPTZ DEFAULT NOW())"
+    ))
+    return set(conn.execute(text("SELECT version FROM schema_migrations")).scalars())
+
+
+def run():
+    engine = create_engine(sync_url())
+    with engine.connect() as conn:
+        conn.execute(text("SELECT pg_advisory_lock(:id)"), {"id": _LOCK_ID})
+        try:
+            applied = _applied(conn)
+            conn.commit()
+            pending = [m for m in migrations() if m[0] not in applied]
+            for version, name, path in pending:
+                # Each migration and its version row commit together
+                conn.exec_driver_sql(path.read_text())
+                conn.execute(text("INSERT INTO schema_migrations (version, name) VALUES (:v, :n)"),
+                             {"v": version, "n": name})
+                conn.commit()
+                print(f"Applied {path.name}")
+            if not pending:
+                print("Schema is up to date")
+        finally:
+            conn.execute(text("SELECT pg_advisory_unlock(:id)"), {"id": _LOCK_ID})
+            conn.commit()
+    engine.dispose()
+
+
+def status():
+    engine = create_engine(sync_url())
+    with engine.connect() as conn:
+        applied = _applied(conn)
+        conn.commit()
+    engine.dispose()
+    for version, name, path in migrations():
+        print(f"{'applied' if version in applied else 'pending'}  {path.name}")
+
+
+# Lookups made on every gameplay request or import, with placeholder values, and the index
+# each must be served by. Indexes created by sql/ and by init_db's create_all are named
+# differently in places, so either name is accepted.
+HOT_QUERIES = {
+    "lyrics window": ("SELECT lines[2:7] FROM song_lyrics WHERE song_id = 1", ("song_lyrics_pkey",)),
+    "active challenges of a song": ("SELECT id FROM challenges WHERE is_active = true AND song_id = 1",
+                                    ("idx_challenges_active_song",)),
+    "score row": ("SELECT id FROM scores WHERE user_id = 1 AND challenge_id = 1", ("uq_scores_user_challenge",)),
+    "scores of a user": ("SELECT challenge_id FROM scores WHERE user_id = 1",
+                         ("idx_scores_user_id", "ix_scores_user_id", "uq_scores_user_challenge")),
+    "scores of a challenge": ("SELECT user_id, points FROM scores WHERE challenge_id = 1", ("idx_scores_challenge_id",)),
+    "duplicate song": ("SELECT id FROM songs WHERE lower(title) = 'tum hi ho' AND lower(artist) = 'arijit singh'",
+                       ("idx_songs_title_artist_lower",)),
+    "challenge context": ("SELECT * FROM challenge_contexts WHERE challenge_id = 1", ("challenge_contexts_pkey",)),
+    "title variants": ("SELECT variant FROM song_title_variants WHERE song_id = 1",
+                       ("idx_song_title_variants_song_id", "ix_song_title_variants_song_id")),
+    "leaderboard top": ("SELECT user_id FROM user_totals ORDER BY total_points DESC, user_id LIMIT 20",
+                        ("idx_user_totals_points",)),
+    "leaderboard bucket": ("SELECT user_id FROM score_rollups WHERE period = 'all' AND language = 'te' "
+                           "ORDER BY points DESC, user_id LIMIT 20", ("idx_score_rollups_rank",)),
+}
+# Served by walking the index in ORDER BY order, so there's no Index Cond to look for
+ORDER_ONLY = {"leaderboard top"}
+
+_INDEX_SCANS = {"Index Scan", "Index Only Scan", "Bitmap Index Scan"}
+
+
+def _nodes(plan: dict):
+    yield plan
+    for child in plan.get("Plans", []):
+        yield from _nodes(child)
+
+
+def check_plan(plan: dict, indexes: tuple[str, ...], order_only: bool = False) -> str | None:
+    """None if `plan` (the "Plan" of EXPLAIN FORMAT JSON) scans one of `indexes` with an
+    Index Cond — or at all, for order_only — else what it does instead."""
+    nodes = list(_nodes(plan))
+    for node in nodes:
+        if node["Node Type"] in _INDEX_SCANS and node.get("Index Name") in indexes \
+                and (order_only or node.get("Index Cond")):
+            return None
+    if seq := [n["Relation Name"] for n in nodes if n["Node Type"] == "Seq Scan"]:
+        return f"seq scan on {', '.join(seq)}"
+    used = [f"{n['Index Name']}{'' if n.get('Index Cond') else ' without Index Cond'}"
+            for n in nodes if n["Node Type"] in _INDEX_SCANS]
+    return f"uses {', '.join(used)}" if used else f"no index scan ({plan['Node Type']})"
+
+
+def plan_problems(conn) -> dict[str, str | None]:
+    """EXPLAIN each hot query with sequential scans discouraged; name → check_plan() result."""
+    conn.execute(text("SET enable_seqscan = off"))
+    problems = {}
+    for name, (sql, indexes) in HOT_QUERIES.items():
+        plan = conn.execute(text(f"EXPLAIN (FORMAT JSON) {sql}")).scalar()
+        if isinstance(plan, str):
+            plan = json.loads(plan)
+        problems[name] = check_plan(plan[0]["Plan"], indexes, name in ORDER_ONLY)
+    conn.rollback()
+    return problems
+
+
+def explain() -> bool:
+    """Check every hot query is served by its index, printing one line per query."""
+    engine = create_engine(sync_url())
+    with engine.connect() as conn:
+        problems = plan_problems(conn)
+    engine.dispose()
+    for name, problem in problems.items():
+        detail = f" ({problem}; expected {' or '.join(HOT_QUERIES[name][1])})" if problem else ""
+        print(f"{'FAIL' if problem else 'ok':4}  {name}{detail}")
+    return not any(problems.values())
+
+
+if __name__ == "__main__":
+    if "--status" in sys.argv:
+        status()
+    elif "--explain" in sys.argv:
+        sys.exit(0 if explain() else 1)
+    else:
+        run()
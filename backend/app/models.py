@@ -1,5 +1,6 @@
-from datetime import datetime, timezone
-from sqlalchemy import String, Text, Integer, Boolean, ForeignKey, DateTime
+from datetime import date, datetime, timezone
+from sqlalchemy import String, Text, Integer, Boolean, ForeignKey, DateTime, Date, UniqueConstraint, Index, func
+from sqlalchemy.dialects.postgresql import ARRAY
 from sqlalchemy.orm import DeclarativeBase, Mapped, mapped_column, relationship
 
 
@@ -22,23 +23,32 @@ class Song(Base):
         DateTime(timezone=True), default=lambda: datetime.now(timezone.utc)
     )
 
-    lyrics: Mapped[list["Lyric"]] = relationship(back_populates="song", cascade="all, delete-orphan")
     challenges: Mapped[list["Challenge"]] = relationship(back_populates="song", cascade="all, delete-orphan")
 
+    __table_args__ = (Index("idx_songs_title_artist_lower", func.lower(title), func.lower(artist)),)
 
-class Lyric(Base):
-    __tablename__ = "lyrics"
+
+class SongTitleVariant(Base):
+    __tablename__ = "song_title_variants"  # normalized alternate titles used for guess matching
 
     id: Mapped[int] = mapped_column(primary_key=True)
-    song_id: Mapped[int] = mapped_column(ForeignKey("songs.id", ondelete="CASCADE"))
-    line_number: Mapped[int] = mapped_column(Integer)
-    text: Mapped[str] = mapped_column(Text)
+    song_id: Mapped[int] = mapped_column(ForeignKey("songs.id", ondelete="CASCADE"), index=True)
+    variant: Mapped[str] = mapped_column(Text)
+
+
+class SongLyrics(Base):
+    __tablename__ = "song_lyrics"  # all of a song's lines in one row; line n is lines[n]
 
-    song: Mapped["Song"] = relationship(back_populates="lyrics")
+    song_id: Mapped[int] = mapped_column(ForeignKey("songs.id", ondelete="CASCADE"), primary_key=True)
+    lines: Mapped[list[str]] = mapped_column(ARRAY(Text))
 
 
 class Challenge(Base):
     __tablename__ = "challenges"
+    __table_args__ = (
+        UniqueConstraint("song_id", "start_line", "end_line", name="uq_challenges_song_lines"),
+        Index("idx_challenges_active_song", "is_active", "song_id"),
+    )
 
     id: Mapped[int] = mapped_column(primary_key=True)
     song_id: Mapped[int] = mapped_column(ForeignKey("songs.id", ondelete="CASCADE"))
@@ -52,6 +62,32 @@ class Challenge(Base):
     song: Mapped["Song"] = relationship(back_populates="challenges")
 
 
+class ChallengeContext(Base):
+    __tablename__ = "challenge_contexts"  # precomputed snippet, hint lines and reveal metadata
+
+    challenge_id: Mapped[int] = mapped_column(ForeignKey("challenges.id", ondelete="CASCADE"), primary_key=True)
+    song_id: Mapped[int] = mapped_column(Integer)
+    lines: Mapped[list[str]] = mapped_column(ARRAY(Text))
+    before: Mapped[list[str]] = mapped_column(ARRAY(Text))
+    after: Mapped[list[str]] = mapped_column(ARRAY(Text))
+    title: Mapped[str] = mapped_column(Text)
+    artist: Mapped[str] = mapped_column(Text)
+    album: Mapped[str | None] = mapped_column(Text, nullable=True)
+    thumbnail_url: Mapped[str | None] = mapped_column(Text, nullable=True)
+
+
+class DailyChallenge(Base):
+    __tablename__ = "daily_challenges"
+
+    day: Mapped[date] = mapped_column(Date, primary_key=True)
+    language: Mapped[str] = mapped_column(String(10), primary_key=True)  # "all" = every language
+    payload: Mapped[str] = mapped_column(Text)  # serialized response body, served verbatim
+    etag: Mapped[str] = mapped_column(String(64))
+    created_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True), default=lambda: datetime.now(timezone.utc)
+    )
+
+
 class User(Base):
     __tablename__ = "users"
 
@@ -68,6 +104,10 @@ class User(Base):
 
 class Score(Base):
     __tablename__ = "scores"
+    __table_args__ = (
+        UniqueConstraint("user_id", "challenge_id", name="uq_scores_user_challenge"),
+        Index("idx_scores_challenge_id", "challenge_id"),
+    )
 
     id: Mapped[int] = mapped_column(primary_key=True)
     user_id: Mapped[int] = mapped_column(ForeignKey("users.id", ondelete="CASCADE"), index=True)
@@ -79,6 +119,33 @@ class Score(Base):
     created_at: Mapped[datetime] = mapped_column(
         DateTime(timezone=True), default=lambda: datetime.now(timezone.utc)
     )
+    # When the points were earned (the correct guess), else when the row was created;
+    # the day/week leaderboard buckets go by this
+    scored_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True), default=lambda: datetime.now(timezone.utc)
+    )
+
+
+class UserTotal(Base):
+    __tablename__ = "user_totals"  # running SUM/COUNT of scores per user, maintained on every score write
+
+    user_id: Mapped[int] = mapped_column(ForeignKey("users.id", ondelete="CASCADE"), primary_key=True)
+    total_points: Mapped[int] = mapped_column(Integer, default=0)
+    games_played: Mapped[int] = mapped_column(Integer, default=0)
+
+    __table_args__ = (Index("idx_user_totals_points", total_points.desc(), "user_id"),)
+
+
+class ScoreRollup(Base):
+    __tablename__ = "score_rollups"  # per-user points per (period, language) bucket; ("all", "all") lives in user_totals
+
+    period: Mapped[str] = mapped_column(String(10), primary_key=True)  # "2026-10-18", "2026-W42" or "all"
+    language: Mapped[str] = mapped_column(String(10), primary_key=True)  # "all" = every language
+    user_id: Mapped[int] = mapped_column(ForeignKey("users.id", ondelete="CASCADE"), primary_key=True)
+    points: Mapped[int] = mapped_column(Integer, default=0)
+    games_played: Mapped[int] = mapped_column(Integer, default=0)
+
+    __table_args__ = (Index("idx_score_rollups_rank", "period", "language", points.desc(), "user_id"),)
 
 
 class BulkImportJob(Base):
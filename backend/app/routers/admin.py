@@ -1,8 +1,9 @@
 from fastapi import APIRouter, Depends, HTTPException, Query
-from sqlalchemy import select, func
+from sqlalchemy import func, select
+from sqlalchemy.exc import IntegrityError
 from sqlalchemy.ext.asyncio import AsyncSession
 from app.db import get_db, async_session
-from app.models import Song, Lyric, Challenge, BulkImportJob
+from app.models import Song, SongLyrics, Challenge, BulkImportJob
 from app.middleware.admin_auth import require_admin
 from app.schemas import (
     SongSearchResponse, SongImportRequest, SongImportResponse,
@@ -12,6 +13,13 @@ from app.schemas import (
 )
 from app.services import ytmusic_service
 from app.services import bulk_import_service
+from app.services import leaderboard_service
+from app.services import lyrics_store
+from app.services.challenge_sampler import sampler
+from app.services.challenge_cache import refresh_context, cache as challenge_cache
+from app.services.title_index import index as title_index
+from app.services.autocomplete import index as autocomplete_index
+from app.services.response_cache import cache as response_cache
 import asyncio
 
 router = APIRouter(prefix="/admin", tags=["admin"], dependencies=[Depends(require_admin)])
@@ -28,15 +36,15 @@ async def debug_genius():
     except ImportError as e:
         result["bs4"] = f"missing: {e}"
     try:
-        import requests
-        r = requests.get("https://api.genius.com/search", params={"q": "Kesariya Arijit Singh"},
-                         headers={"Authorization": f"Bearer {token}"}, timeout=10)
+        from app.services.upstream import genius
+        r = await genius.get("https://api.genius.com/search", params={"q": "Kesariya Arijit Singh"},
+                             headers={"Authorization": f"Bearer {token}"})
         data = r.json()
         hits = data.get("response", {}).get("hits", [])
         result["api_search"] = f"{len(hits)} hits" if hits else "0 hits"
         if hits:
             url = hits[0]["result"]["url"]
-            page = requests.get(url, timeout=10)
+            page = await genius.get(url)
             soup = BeautifulSoup(page.text, "html.parser")
             divs = soup.select('div[data-lyrics-container="true"]')
             result["scrape"] = f"{len(divs)} lyric divs found"
@@ -49,18 +57,23 @@ async def debug_genius():
 
 @router.post("/songs/search", response_model=SongSearchResponse)
 async def search_songs(q: str = Query(..., min_length=1)):
-    return SongSearchResponse(results=ytmusic_service.search_songs(q))
+    try:
+        return SongSearchResponse(results=await ytmusic_service.search_songs(q))
+    except TimeoutError as e:
+        raise HTTPException(504, str(e))
 
 
 @router.post("/songs/import", response_model=SongImportResponse)
 async def import_song(req: SongImportRequest, db: AsyncSession = Depends(get_db)):
     try:
-        song, lyric_count = await ytmusic_service.import_song(req.video_id, db, language_override=req.language)
+        song_id, song = await ytmusic_service.import_song(req.video_id, db, language_override=req.language)
     except ValueError:
         raise HTTPException(409, "Song already imported")
     except LookupError as e:
         raise HTTPException(404, str(e))
-    return SongImportResponse(id=song.id, title=song.title, artist=song.artist, lyric_count=lyric_count)
+    except TimeoutError as e:
+        raise HTTPException(504, str(e))
+    return SongImportResponse(id=song_id, title=song.title, artist=song.artist, lyric_count=len(song.lines))
 
 
 @router.get("/songs", response_model=list[SongOut])
@@ -78,8 +91,8 @@ async def get_song_lyrics(song_id: int, db: AsyncSession = Depends(get_db)):
     song = await db.get(Song, song_id)
     if not song:
         raise HTTPException(404, "Song not found")
-    result = await db.execute(select(Lyric).where(Lyric.song_id == song_id).order_by(Lyric.line_number))
-    return [LyricLineOut(line_number=l.line_number, text=l.text) for l in result.scalars()]
+    lines = await lyrics_store.all_lines(db, song_id)
+    return [LyricLineOut(line_number=i, text=text) for i, text in enumerate(lines)]
 
 
 @router.put("/songs/{song_id}/language")
@@ -89,6 +102,9 @@ async def set_language(song_id: int, language: str = Query(..., min_length=2, ma
         raise HTTPException(404, "Song not found")
     song.language = language.lower()
     await db.commit()
+    sampler.invalidate()
+    autocomplete_index.add(song.id, song.title, song.artist, song.language)
+    response_cache.invalidate("languages")
     return {"ok": True, "language": song.language}
 
 
@@ -97,8 +113,22 @@ async def delete_song(song_id: int, db: AsyncSession = Depends(get_db)):
     song = await db.get(Song, song_id)
     if not song:
         raise HTTPException(404, "Song not found")
+    await leaderboard_service.retract_scores(db, select(Challenge.id).where(Challenge.song_id == song_id))
     await db.delete(song)
     await db.commit()
+    sampler.invalidate()
+    challenge_cache.clear()
+    title_index.remove(song_id)
+    autocomplete_index.remove(song_id)
+    response_cache.invalidate("languages")
+    return {"ok": True}
+
+
+# --- Leaderboard ---
+
+@router.post("/leaderboard/rebuild")
+async def rebuild_leaderboard(db: AsyncSession = Depends(get_db)):
+    await leaderboard_service.rebuild_totals(db)
     return {"ok": True}
 
 
@@ -113,35 +143,34 @@ async def create_challenge(req: ChallengeCreate, db: AsyncSession = Depends(get_
         raise HTTPException(422, "start_line must be <= end_line")
 
     # Verify lines exist
-    result = await db.execute(
-        select(func.count()).select_from(Lyric)
-        .where(Lyric.song_id == req.song_id, Lyric.line_number.between(req.start_line, req.end_line))
-    )
-    if result.scalar() == 0:
+    if not await lyrics_store.line_range(db, req.song_id, req.start_line, req.end_line):
         raise HTTPException(422, "Selected lines do not exist for this song")
 
-    # Check for duplicate
-    dup = await db.execute(
-        select(Challenge).where(
-            Challenge.song_id == req.song_id,
-            Challenge.start_line == req.start_line,
-            Challenge.end_line == req.end_line,
-        )
-    )
-    if dup.scalar_one_or_none():
-        raise HTTPException(409, "Challenge with these lines already exists")
-
     challenge = Challenge(song_id=req.song_id, start_line=req.start_line, end_line=req.end_line)
     db.add(challenge)
+    try:
+        await db.flush()
+    except IntegrityError:
+        raise HTTPException(409, "Challenge with these lines already exists")
+    await refresh_context(challenge, db)
     await db.commit()
-    await db.refresh(challenge)
-    return await _challenge_out(challenge, db)
+    sampler.invalidate()
+    return (await _challenge_outs(db, Challenge.id == challenge.id))[0]
 
 
 @router.get("/challenges", response_model=list[ChallengeOut])
-async def list_challenges(db: AsyncSession = Depends(get_db)):
-    result = await db.execute(select(Challenge).order_by(Challenge.created_at.desc()))
-    return [await _challenge_out(c, db) for c in result.scalars()]
+async def list_challenges(
+    song_id: int | None = Query(None), language: str | None = Query(None), is_active: bool | None = Query(None),
+    db: AsyncSession = Depends(get_db),
+):
+    filters = []
+    if song_id is not None:
+        filters.append(Challenge.song_id == song_id)
+    if language:
+        filters.append(Song.language == language.lower())
+    if is_active is not None:
+        filters.append(Challenge.is_active == is_active)
+    return await _challenge_outs(db, *filters)
 
 
 @router.put("/challenges/{challenge_id}", response_model=ChallengeOut)
@@ -159,10 +188,15 @@ async def update_challenge(challenge_id: int, req: ChallengeUpdate, db: AsyncSes
 
     if challenge.start_line > challenge.end_line:
         raise HTTPException(422, "start_line must be <= end_line")
+    try:
+        await db.flush()
+    except IntegrityError:
+        raise HTTPException(409, "Challenge with these lines already exists")
 
+    await refresh_context(challenge, db)
     await db.commit()
-    await db.refresh(challenge)
-    return await _challenge_out(challenge, db)
+    sampler.invalidate()
+    return (await _challenge_outs(db, Challenge.id == challenge.id))[0]
 
 
 @router.delete("/challenges/{challenge_id}")
@@ -170,27 +204,31 @@ async def delete_challenge(challenge_id: int, db: AsyncSession = Depends(get_db)
     challenge = await db.get(Challenge, challenge_id)
     if not challenge:
         raise HTTPException(404, "Challenge not found")
+    await leaderboard_service.retract_scores(db, [challenge_id])
     await db.delete(challenge)
     await db.commit()
+    sampler.invalidate()
+    challenge_cache.discard(challenge_id)
     return {"ok": True}
 
 
-async def _challenge_out(challenge: Challenge, db: AsyncSession) -> ChallengeOut:
-    song = await db.get(Song, challenge.song_id)
+async def _challenge_outs(db: AsyncSession, *where) -> list[ChallengeOut]:
+    """Challenges with their song and lyric preview in one query; the preview is sliced and joined in SQL."""
+    lines = SongLyrics.lines[Challenge.start_line + 1:Challenge.end_line + 1]
+    preview = func.coalesce(func.left(func.array_to_string(lines, " / "), 120), "")
     result = await db.execute(
-        select(Lyric.text).where(
-            Lyric.song_id == challenge.song_id,
-            Lyric.line_number.between(challenge.start_line, challenge.end_line),
-        ).order_by(Lyric.line_number)
-    )
-    lines = [r[0] for r in result]
-    preview = " / ".join(lines)[:120]
-    return ChallengeOut(
-        id=challenge.id, song_id=challenge.song_id,
-        song_title=song.title, song_artist=song.artist,
-        start_line=challenge.start_line, end_line=challenge.end_line,
-        is_active=challenge.is_active, preview=preview,
+        select(Challenge.id, Challenge.song_id, Song.title, Song.artist, Challenge.start_line, Challenge.end_line,
+               Challenge.is_active, preview)
+        .join(Song, Song.id == Challenge.song_id)
+        .outerjoin(SongLyrics, SongLyrics.song_id == Challenge.song_id)
+        .where(*where)
+        .order_by(Challenge.created_at.desc())
     )
+    return [
+        ChallengeOut(id=cid, song_id=song_id, song_title=title, song_artist=artist,
+                     start_line=start, end_line=end, is_active=active, preview=preview)
+        for cid, song_id, title, artist, start, end, active, preview in result
+    ]
 
 
 # --- Bulk Import ---
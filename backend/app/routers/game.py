@@ -1,132 +1,174 @@
-from fastapi import APIRouter, Depends, HTTPException, Query
-from sqlalchemy import select, func, case, literal
+from collections.abc import Container
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response
+from sqlalchemy import select
 from sqlalchemy.ext.asyncio import AsyncSession
-from app.db import get_db
-from app.models import Song, Lyric, Challenge, Score, User
-from app.schemas import GameChallenge, GuessRequest, GuessResponse, HintResponse, RevealResponse
+from app.db import get_db, get_read_db
+from app.models import Song
+from app.schemas import GameChallenge, DailyChallengeOut, AutocompleteSuggestion, GuessRequest, GuessResponse, HintResponse, RevealResponse
+from app.services import daily_service, score_service
+from app.services.autocomplete import index as autocomplete_index
+from app.services.response_cache import cache as response_cache
 from app.services.game_service import check_guess, platform_urls
+from app.services.challenge_sampler import sampler
+from app.services.seen_tracker import SeenUnion, tracker as seen_tracker
+from app.services.challenge_cache import CachedChallenge, cache as challenge_cache
+from app.snapshot import snapshot
 
 router = APIRouter(prefix="/game", tags=["game"])
 
 
 @router.get("/languages")
-async def get_languages(db: AsyncSession = Depends(get_db)):
-    result = await db.execute(
-        select(Song.language).where(Song.language.isnot(None)).distinct().order_by(Song.language)
-    )
-    return [r[0] for r in result]
+async def get_languages(db: AsyncSession = Depends(get_read_db)):
+    async def compute():
+        if snapshot is not None:
+            return snapshot.languages()
+        result = await db.execute(
+            select(Song.language).where(Song.language.isnot(None)).distinct().order_by(Song.language)
+        )
+        return [r[0] for r in result]
+    return await response_cache.get("languages", (), compute)
 
 
 @router.get("/challenge", response_model=GameChallenge)
-async def get_challenge(language: str | None = Query(None), exclude: str | None = Query(None), db: AsyncSession = Depends(get_db)):
-    q = select(Challenge).join(Song, Challenge.song_id == Song.id).where(Challenge.is_active == True)
-    if language:
-        q = q.where(Song.language == language.lower())
-    if exclude:
-        try:
-            ids = [int(x) for x in exclude.split(",") if x.strip()]
-            if ids:
-                q = q.where(Challenge.id.notin_(ids))
-        except ValueError:
-            pass
-    # Weight newer songs higher: year 2025+ → weight 5, 2022-2024 → 3, older/unknown → 1
-    weight = case(
-        (Song.year >= 2025, literal(5)),
-        (Song.year >= 2022, literal(3)),
-        else_=literal(1),
-    )
-    result = await db.execute(q.order_by((func.random() * weight).desc()).limit(1))
-    challenge = result.scalar_one_or_none()
+async def get_challenge(
+    language: str | None = Query(None), user_id: int | None = Query(None),
+    exclude: str | None = Query(None), db: AsyncSession = Depends(get_read_db),
+):
+    seen = await _seen_for(user_id, exclude, db)
+    challenge = await _pick_challenge(db, language, seen)
+    if not challenge and user_id and seen:
+        # Played everything available — start a fresh cycle through this language
+        await _new_cycle(user_id, language, db)
+        challenge = await _pick_challenge(db, language, await _seen_for(user_id, exclude, db))
     if not challenge:
         raise HTTPException(404, "No active challenges available")
+    return GameChallenge(challenge_id=challenge.challenge_id, lines=list(challenge.lines))
+
+
+@router.get("/challenges/batch", response_model=list[GameChallenge])
+async def get_challenge_batch(
+    n: int = Query(10, ge=1, le=50), language: str | None = Query(None), user_id: int | None = Query(None),
+    exclude: str | None = Query(None), db: AsyncSession = Depends(get_read_db),
+):
+    # One sampling pass + one context fetch so clients can prefetch a whole round
+    seen = await _seen_for(user_id, exclude, db)
+    ids = await sampler.sample_many(db, n, language, seen)
+    if not ids and user_id and seen:
+        await _new_cycle(user_id, language, db)
+        ids = await sampler.sample_many(db, n, language, await _seen_for(user_id, exclude, db))
+    contexts = await challenge_cache.get_many(ids, db, active_only=True)
+    if len(contexts) < len(ids):
+        sampler.invalidate()  # some ids were deleted or deactivated by another worker
+    challenges = [contexts[cid] for cid in ids if cid in contexts]
+    if not challenges:
+        raise HTTPException(404, "No active challenges available")
+    return [GameChallenge(challenge_id=c.challenge_id, lines=list(c.lines)) for c in challenges]
 
-    lines_result = await db.execute(
-        select(Lyric.text).where(
-            Lyric.song_id == challenge.song_id,
-            Lyric.line_number.between(challenge.start_line, challenge.end_line),
-        ).order_by(Lyric.line_number)
-    )
-    return GameChallenge(challenge_id=challenge.id, lines=[r[0] for r in lines_result])
+
+@router.get("/daily", response_model=DailyChallengeOut)
+async def get_daily(request: Request, language: str | None = Query(None), db: AsyncSession = Depends(get_db)):
+    payload = await daily_service.get_daily(db, language)
+    if not payload:
+        raise HTTPException(404, "No active challenges available")
+    etag = f'"{payload.etag}"'
+    ttl = daily_service.seconds_until_rollover()
+    headers = {"ETag": etag, "Cache-Control": f"public, max-age={ttl}, s-maxage={ttl}"}
+    if etag in [t.strip() for t in request.headers.get("if-none-match", "").split(",")]:
+        return Response(status_code=304, headers=headers)
+    return Response(payload.body, media_type="application/json", headers=headers)
+
+
+@router.get("/autocomplete", response_model=list[AutocompleteSuggestion])
+async def autocomplete(q: str = Query(..., min_length=1, max_length=100), language: str | None = Query(None),
+                       limit: int = Query(8, ge=1, le=20)):
+    return [AutocompleteSuggestion(title=t, artist=a) for t, a in await autocomplete_index.suggest(q, language, limit)]
 
 
 @router.post("/guess", response_model=GuessResponse)
-async def guess_song(req: GuessRequest, db: AsyncSession = Depends(get_db)):
-    challenge = await db.get(Challenge, req.challenge_id)
+async def guess_song(
+    req: GuessRequest, db: AsyncSession = Depends(get_db), read_db: AsyncSession = Depends(get_read_db),
+):
+    challenge = await challenge_cache.get(req.challenge_id, read_db)
     if not challenge:
         raise HTTPException(404, "Challenge not found")
 
-    song = await db.get(Song, challenge.song_id)
-    result = check_guess(req.guess, song.title)
+    result = await check_guess(req.guess, challenge.title, req.challenge_id, challenge.song_id)
 
     # Track score if user provided
+    if req.user_id:
+        seen_tracker.mark(req.user_id, req.challenge_id)
     if req.user_id and result["correct"]:
-        user = await db.get(User, req.user_id)
-        if user:
-            existing = await db.execute(
-                select(Score).where(Score.user_id == req.user_id, Score.challenge_id == req.challenge_id, Score.guessed_correct == True)
-            )
-            if not existing.first():
-                used_hint = await _has_hint(req.user_id, req.challenge_id, db)
-                points = 5 if used_hint else 10
-                db.add(Score(user_id=req.user_id, challenge_id=req.challenge_id, guessed_correct=True, used_hint=used_hint, points=points))
-                await db.commit()
+        await score_service.record(db, req.user_id, req.challenge_id, score_service.GUESS)
 
     return GuessResponse(**result)
 
 
 @router.get("/hint/{challenge_id}", response_model=HintResponse)
-async def get_hint(challenge_id: int, user_id: int | None = Query(None), db: AsyncSession = Depends(get_db)):
-    challenge = await db.get(Challenge, challenge_id)
+async def get_hint(
+    challenge_id: int, user_id: int | None = Query(None),
+    db: AsyncSession = Depends(get_db), read_db: AsyncSession = Depends(get_read_db),
+):
+    challenge = await challenge_cache.get(challenge_id, read_db)
     if not challenge:
         raise HTTPException(404, "Challenge not found")
 
     # Record hint usage
     if user_id:
-        user = await db.get(User, user_id)
-        if user:
-            existing = await db.execute(
-                select(Score).where(Score.user_id == user_id, Score.challenge_id == challenge_id)
-            )
-            if not existing.first():
-                db.add(Score(user_id=user_id, challenge_id=challenge_id, used_hint=True))
-                await db.commit()
-
-    before_result = await db.execute(
-        select(Lyric.text).where(Lyric.song_id == challenge.song_id, Lyric.line_number == challenge.start_line - 1)
-    )
-    after_result = await db.execute(
-        select(Lyric.text).where(Lyric.song_id == challenge.song_id, Lyric.line_number == challenge.end_line + 1)
-    )
-    return HintResponse(challenge_id=challenge_id, before=[r[0] for r in before_result], after=[r[0] for r in after_result])
+        seen_tracker.mark(user_id, challenge_id)
+        await score_service.record(db, user_id, challenge_id, score_service.HINT)
+
+    return HintResponse(challenge_id=challenge_id, before=list(challenge.before), after=list(challenge.after))
 
 
 @router.get("/reveal/{challenge_id}", response_model=RevealResponse)
-async def reveal_song(challenge_id: int, user_id: int | None = Query(None), db: AsyncSession = Depends(get_db)):
-    challenge = await db.get(Challenge, challenge_id)
+async def reveal_song(
+    challenge_id: int, user_id: int | None = Query(None),
+    db: AsyncSession = Depends(get_db), read_db: AsyncSession = Depends(get_read_db),
+):
+    challenge = await challenge_cache.get(challenge_id, read_db)
     if not challenge:
         raise HTTPException(404, "Challenge not found")
 
     # Record reveal (0 points)
     if user_id:
-        user = await db.get(User, user_id)
-        if user:
-            existing = await db.execute(
-                select(Score).where(Score.user_id == user_id, Score.challenge_id == challenge_id)
-            )
-            if not existing.first():
-                db.add(Score(user_id=user_id, challenge_id=challenge_id, revealed=True, points=0))
-                await db.commit()
-
-    song = await db.get(Song, challenge.song_id)
+        seen_tracker.mark(user_id, challenge_id)
+        await score_service.record(db, user_id, challenge_id, score_service.REVEAL)
+
     return RevealResponse(
-        title=song.title, artist=song.artist, album=song.album,
-        thumbnail_url=song.thumbnail_url,
-        platform_links=platform_urls(song.artist, song.title),
+        title=challenge.title, artist=challenge.artist, album=challenge.album,
+        thumbnail_url=challenge.thumbnail_url,
+        platform_links=platform_urls(challenge.artist, challenge.title),
     )
 
 
-async def _has_hint(user_id: int, challenge_id: int, db: AsyncSession) -> bool:
-    result = await db.execute(
-        select(Score).where(Score.user_id == user_id, Score.challenge_id == challenge_id, Score.used_hint == True)
-    )
-    return result.scalar_one_or_none() is not None
+async def _pick_challenge(db: AsyncSession, language: str | None, exclude: Container[int]) -> CachedChallenge | None:
+    for _ in range(2):
+        challenge_id = await sampler.sample(db, language, exclude)
+        if challenge_id is None:
+            return None
+        challenge = await challenge_cache.get(challenge_id, db, active_only=True)
+        if challenge:
+            return challenge
+        # Deleted or deactivated by another worker since our tables were built
+        sampler.invalidate()
+    return None
+
+
+async def _new_cycle(user_id: int, language: str | None, db: AsyncSession):
+    # Only the exhausted language's ids are forgotten; other languages stay played
+    await seen_tracker.reset(user_id, db, await sampler.ids(db, language) if language else None)
+
+
+async def _seen_for(user_id: int | None, exclude: str | None, db: AsyncSession) -> Container[int]:
+    # Registered players are tracked server-side (marked when they guess, hint or reveal), plus
+    # whatever the client lists in `exclude` — e.g. challenges it was served but hasn't played yet
+    excluded = set()
+    if exclude:
+        try:
+            excluded = {int(x) for x in exclude.split(",") if x.strip()}
+        except ValueError:
+            pass
+    if not user_id:
+        return excluded
+    seen = await seen_tracker.get(user_id, db)
+    return SeenUnion(seen, excluded) if excluded else seen
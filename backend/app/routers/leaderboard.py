@@ -1,27 +1,44 @@
-from fastapi import APIRouter, Depends, Query
-from sqlalchemy import select, func
+from fastapi import APIRouter, Depends, HTTPException, Query
 from sqlalchemy.ext.asyncio import AsyncSession
-from app.db import get_db
-from app.models import User, Score
+from app.db import get_read_db
+from app.services.leaderboard_service import board_for
+from app.services.response_cache import cache as response_cache
 
 router = APIRouter(prefix="/leaderboard", tags=["leaderboard"])
 
+PERIOD = Query("all", pattern="^(day|week|all)$")
+LANGUAGE = Query(None, max_length=10)  # score_rollups.language is VARCHAR(10)
+
 
 @router.get("")
-async def get_leaderboard(limit: int = Query(20, le=100), db: AsyncSession = Depends(get_db)):
-    result = await db.execute(
-        select(
-            User.id, User.username, User.first_name, User.last_name, User.avatar_url,
-            func.sum(Score.points).label("total_points"),
-            func.count(Score.id).label("games_played"),
-        )
-        .join(Score, Score.user_id == User.id)
-        .group_by(User.id)
-        .order_by(func.sum(Score.points).desc())
-        .limit(limit)
-    )
-    return [
-        {"user_id": r.id, "username": r.username, "first_name": r.first_name, "last_name": r.last_name,
-         "avatar_url": r.avatar_url, "total_points": r.total_points, "games_played": r.games_played}
-        for r in result
-    ]
+async def get_leaderboard(
+    limit: int = Query(20, ge=1, le=100), period: str = PERIOD, language: str | None = LANGUAGE,
+    db: AsyncSession = Depends(get_read_db),
+):
+    return await response_cache.get(
+        "leaderboard", (period, language, limit), lambda: board_for(period, language).top(db, limit))
+
+
+@router.get("/rank/{user_id}")
+async def get_rank(
+    user_id: int, period: str = PERIOD, language: str | None = LANGUAGE, db: AsyncSession = Depends(get_read_db),
+):
+    async def compute():
+        entry = await board_for(period, language).rank(db, user_id)
+        if entry is None:
+            raise HTTPException(404, "No scores for this user")
+        return entry
+    return await response_cache.get("leaderboard_rank", (user_id, "rank", period, language), compute)
+
+
+@router.get("/around/{user_id}")
+async def get_around(
+    user_id: int, window: int = Query(5, ge=1, le=25), period: str = PERIOD, language: str | None = LANGUAGE,
+    db: AsyncSession = Depends(get_read_db),
+):
+    async def compute():
+        page = await board_for(period, language).around(db, user_id, window)
+        if page is None:
+            raise HTTPException(404, "No scores for this user")
+        return page
+    return await response_cache.get("leaderboard_rank", (user_id, "around", period, language, window), compute)
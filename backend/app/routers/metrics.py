@@ -0,0 +1,26 @@
+from fastapi import APIRouter, Depends
+from app.db import engine, read_engine, replica, pool_metrics
+from app.middleware.admin_auth import require_admin
+from app.services.response_cache import cache as response_cache
+from app.services.fetch_cache import cache as fetch_cache
+
+# Pool settings, replica health and cache paths are for operators only
+router = APIRouter(prefix="/metrics", tags=["metrics"], dependencies=[Depends(require_admin)])
+
+
+@router.get("/cache")
+async def cache_metrics():
+    return response_cache.metrics()
+
+
+@router.get("/fetch-cache")
+async def fetch_cache_metrics():
+    return fetch_cache.metrics()
+
+
+@router.get("/db")
+async def db_metrics():
+    metrics = pool_metrics(engine) if engine is not None else {}
+    if read_engine is not None:
+        metrics["replica"] = {**pool_metrics(read_engine), "healthy": replica.healthy, "lag_seconds": replica.lag}
+    return metrics
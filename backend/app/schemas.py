@@ -65,6 +65,15 @@ class GameChallenge(BaseModel):
     challenge_id: int
     lines: list[str]
 
+class DailyChallengeOut(BaseModel):
+    date: str
+    language: str | None = None
+    challenges: list[GameChallenge]
+
+class AutocompleteSuggestion(BaseModel):
+    title: str
+    artist: str
+
 class GuessRequest(BaseModel):
     challenge_id: int
     guess: str
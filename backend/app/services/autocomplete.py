@@ -0,0 +1,139 @@
+import asyncio
+import os
+from bisect import bisect_left, insort
+from collections import OrderedDict
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.db import async_session
+from app.models import Song
+from app.services.title_matcher import normalize_text, transliterate
+from app.snapshot import snapshot
+
+MAX_SONGS_PER_LANGUAGE = int(os.getenv("AUTOCOMPLETE_MAX_SONGS", "20000"))
+
+
+def _keys(text: str) -> list[str]:
+    """Every word-start suffix, so "tum hi ho" is found by "tum", "hi" or "ho"."""
+    words = normalize_text(transliterate(text)).split()
+    return [" ".join(words[i:]) for i in range(len(words))]
+
+
+class _LanguageIndex:
+    def __init__(self):
+        self.keys: list[tuple[str, int]] = []  # sorted (key, song_id)
+        self.songs: OrderedDict[int, tuple[str, str, list[str]]] = OrderedDict()  # id → (title, artist, keys)
+
+    def add(self, song_id: int, title: str, artist: str):
+        keys = _keys(title) + _keys(artist)
+        self.songs[song_id] = (title, artist, keys)
+        for key in keys:
+            insort(self.keys, (key, song_id))
+
+    def extend(self, songs):
+        """Add (song_id, title, artist) rows, sorting the keys once rather than inserting each."""
+        for song_id, title, artist in songs:
+            keys = _keys(title) + _keys(artist)
+            self.songs[song_id] = (title, artist, keys)
+            self.keys.extend((key, song_id) for key in keys)
+        self.keys.sort()
+
+    def remove(self, song_id: int):
+        _, _, keys = self.songs.pop(song_id)
+        for key in keys:
+            i = bisect_left(self.keys, (key, song_id))
+            if i < len(self.keys) and self.keys[i] == (key, song_id):
+                del self.keys[i]
+
+    def search(self, prefix: str, limit: int) -> list[tuple[int, str]]:
+        """(song_id, matched key) pairs in key order, at most one per song."""
+        out: dict[int, str] = {}
+        i = bisect_left(self.keys, (prefix, -1))
+        while i < len(self.keys) and len(out) < limit:
+            key, song_id = self.keys[i]
+            if not key.startswith(prefix):
+                break
+            out.setdefault(song_id, key)
+            i += 1
+        return list(out.items())
+
+
+class AutocompleteIndex:
+    """Sorted prefix index over normalized song titles and artists, one per language.
+
+    Loaded at startup; if that failed, the first suggestion loads it.
+    """
+
+    def __init__(self, max_songs: int = MAX_SONGS_PER_LANGUAGE):
+        self.max_songs = max_songs
+        self._languages: dict[str | None, _LanguageIndex] = {}
+        self._song_language: dict[int, str | None] = {}
+        self._loaded = False
+        self._lock = asyncio.Lock()
+
+    async def _ensure_loaded(self):
+        if self._loaded:
+            return
+        async with self._lock:
+            if self._loaded:
+                return
+            if snapshot is not None:
+                self.load_rows(snapshot.songs())
+            else:
+                async with async_session() as db:
+                    await self.load(db)
+
+    async def load(self, db: AsyncSession):
+        result = await db.execute(select(Song.id, Song.title, Song.artist, Song.language).order_by(Song.created_at))
+        self.load_rows(result)
+
+    def load_rows(self, rows):
+        """Replace the index with (id, title, artist, language) rows, oldest first."""
+        by_language: dict[str | None, list[tuple[int, str, str]]] = {}
+        for song_id, title, artist, language in rows:
+            by_language.setdefault(language, []).append((song_id, title, artist))
+        self._languages, self._song_language = {}, {}
+        for language, songs in by_language.items():
+            # Same cap as add(): only the newest max_songs of each language are kept
+            songs = songs[-self.max_songs:] if self.max_songs > 0 else []
+            self._languages.setdefault(language, _LanguageIndex()).extend(songs)
+            self._song_language.update((song_id, language) for song_id, _, _ in songs)
+        self._loaded = True
+
+    def add(self, song_id: int, title: str, artist: str, language: str | None):
+        self.remove(song_id)
+        idx = self._languages.setdefault(language, _LanguageIndex())
+        idx.add(song_id, title, artist)
+        self._song_language[song_id] = language
+        # Cap memory per language — the oldest songs drop out of suggestions first
+        while len(idx.songs) > self.max_songs:
+            oldest = next(iter(idx.songs))
+            idx.remove(oldest)
+            del self._song_language[oldest]
+
+    def remove(self, song_id: int):
+        if song_id in self._song_language:
+            self._languages[self._song_language.pop(song_id)].remove(song_id)
+
+    async def suggest(self, q: str, language: str | None = None, limit: int = 8) -> list[tuple[str, str]]:
+        """(title, artist) suggestions; title-prefix matches rank before artist or mid-title ones."""
+        await self._ensure_loaded()
+        prefix = normalize_text(transliterate(q))
+        if not prefix:
+            return []
+        if language:
+            indexes = [self._languages.get(language.lower())]
+        else:
+            indexes = list(self._languages.values())
+
+        hits = []
+        for idx in indexes:
+            if not idx:
+                continue
+            for song_id, key in idx.search(prefix, limit * 4):
+                title, artist, keys = idx.songs[song_id]
+                hits.append((key != keys[0], len(title), title, artist))
+        hits.sort()
+        return [(title, artist) for _, _, title, artist in hits[:limit]]
+
+
+index = AutocompleteIndex()
@@ -2,18 +2,33 @@ import asyncio
 import os
 import random
 import logging
+import time
 from collections import Counter
-from ytmusicapi import YTMusic
+from dataclasses import dataclass
 from langdetect import detect, DetectorFactory
 DetectorFactory.seed = 0
-import requests
 from bs4 import BeautifulSoup
-from sqlalchemy import select, func
+from sqlalchemy import Text, func, literal, select
+from sqlalchemy.dialects.postgresql import ARRAY, insert
+from sqlalchemy.exc import IntegrityError
 from sqlalchemy.ext.asyncio import AsyncSession
-from app.models import Song, Lyric, Challenge, BulkImportJob
+from app.models import Song, SongLyrics, SongTitleVariant, Challenge, ChallengeContext, BulkImportJob
+from app.services.lyrics_store import all_lines
+from app.services.challenge_sampler import sampler
+from app.services.challenge_cache import build_context
+from app.services.title_index import title_variants, index as title_index
+from app.services.autocomplete import index as autocomplete_index
+from app.services.response_cache import cache as response_cache
+from app.services.upstream import yt, genius
+from app.services.fetch_cache import cache as fetch_cache
 
 logger = logging.getLogger(__name__)
-yt = YTMusic()
+
+# Worker pool per pipeline stage; DB writes stay on one worker so the title duplicate check can't race
+FETCH_WORKERS = int(os.getenv("BULK_FETCH_WORKERS", "4"))
+DETECT_WORKERS = int(os.getenv("BULK_DETECT_WORKERS", "2"))
+CHALLENGE_WORKERS = int(os.getenv("BULK_CHALLENGE_WORKERS", "2"))
+PROGRESS_SECONDS = float(os.getenv("BULK_PROGRESS_SECONDS", "2"))
 
 # Genius fallback for lyrics
 _genius_token = None
@@ -23,32 +38,39 @@ def _get_genius_token():
         _genius_token = os.getenv("GENIUS_API_TOKEN", "")
     return _genius_token
 
-def _genius_lyrics(title: str, artist: str) -> list[str] | None:
-    """Fetch lyrics from Genius API + scraping."""
+async def _genius_lyrics(title: str, artist: str) -> list[str] | None:
+    """Fetch lyrics from Genius API + scraping; results, including "not found", go through the fetch cache."""
     token = _get_genius_token()
     if not token:
         return None
     try:
-        r = requests.get("https://api.genius.com/search", params={"q": f"{title} {artist}"},
-                         headers={"Authorization": f"Bearer {token}"}, timeout=10)
-        hits = r.json().get("response", {}).get("hits", [])
-        if not hits:
-            return None
-        page = requests.get(hits[0]["result"]["url"], timeout=10)
-        soup = BeautifulSoup(page.text, "html.parser")
-        divs = soup.select('div[data-lyrics-container="true"]')
-        if not divs:
-            return None
-        lines = []
-        for d in divs:
-            for br in d.find_all("br"):
-                br.replace_with("\n")
-            lines.extend(d.get_text().split("\n"))
-        return [l.strip() for l in lines if l.strip() and not l.startswith("[")]
+        return await fetch_cache.acached("genius", (title, artist), lambda: _fetch_genius(title, artist, token))
     except Exception as e:
         logger.warning(f"Genius failed for {title}: {e}")
         return None
 
+
+async def _fetch_genius(title: str, artist: str, token: str) -> list[str] | None:
+    r = await genius.get("https://api.genius.com/search", params={"q": f"{title} {artist}"},
+                         headers={"Authorization": f"Bearer {token}"})
+    r.raise_for_status()  # errors aren't cached as "no lyrics"
+    hits = r.json().get("response", {}).get("hits", [])
+    if not hits:
+        return None
+    page = await genius.get(hits[0]["result"]["url"])
+    page.raise_for_status()
+    soup = BeautifulSoup(page.text, "html.parser")
+    divs = soup.select('div[data-lyrics-container="true"]')
+    if not divs:
+        return None
+    lines = []
+    for d in divs:
+        for br in d.find_all("br"):
+            br.replace_with("\n")
+        lines.extend(d.get_text().split("\n"))
+    return [l.strip() for l in lines if l.strip() and not l.startswith("[")]
+
+
 # Language → search terms for discovery
 LANG_QUERIES = {
     "en": ["top hits", "popular songs", "best songs", "greatest hits", "hit songs"],
@@ -83,7 +105,7 @@ async def discover_ytmusic(language: str | None, count: int, year_from: int | No
                 break
             q = f"{base_q} {year}" if year else base_q
             try:
-                hits = yt.search(q, filter="songs", limit=min(50, count - len(results) + 10))
+                hits = await yt.search(q, filter="songs", limit=min(50, count - len(results) + 10))
             except Exception as e:
                 logger.warning(f"Search failed for '{q}': {e}")
                 continue
@@ -108,7 +130,6 @@ async def discover_ytmusic(language: str | None, count: int, year_from: int | No
                 })
                 if len(results) >= count:
                     break
-            await asyncio.sleep(0.5)  # rate limit
 
     random.shuffle(results)
     return results[:count]
@@ -124,82 +145,117 @@ def _year_range(year_from: int | None, year_to: int | None) -> list[int | None]:
     return [None]
 
 
-async def import_single(video_id: str, db: AsyncSession, language_override: str | None = None) -> tuple[Song, int] | None:
-    """Import one song with lyrics. Returns (song, lyric_count) or None on failure."""
-    # Check duplicate by video_id
-    existing = await db.execute(select(Song).where(Song.yt_video_id == video_id))
-    if existing.scalar_one_or_none():
-        return None  # already exists
-
-    try:
-        song_data = yt.get_song(video_id)
-        details = song_data.get("videoDetails", {})
-        title = details.get("title", "Unknown")
-        artist = details.get("author", "Unknown")
-
-        # Skip songs with unknown metadata
-        if title.lower() in ("unknown", "") or artist.lower() in ("unknown", ""):
-            return None
-
-        # Check duplicate by title+artist (same song, different video)
-        dup = await db.execute(
-            select(Song).where(func.lower(Song.title) == title.strip().lower(), func.lower(Song.artist) == artist.strip().lower())
-        )
-        if dup.scalar_one_or_none():
-            return None
-        thumbs = details.get("thumbnail", {}).get("thumbnails", [])
-
-        watch = yt.get_watch_playlist(videoId=video_id)
-        lyrics_browse_id = watch.get("lyrics")
-        lines = None
-
-        # Try YT Music lyrics first
-        if lyrics_browse_id:
-            lyrics_data = yt.get_lyrics(lyrics_browse_id)
-            if lyrics_data and lyrics_data.get("lyrics"):
-                raw = lyrics_data["lyrics"]
-                lines = [l for l in (raw.split("\n") if isinstance(raw, str) else [l.text for l in raw]) if l.strip()]
-
-        # Fallback to Genius
-        if not lines or len(lines) < 6:
-            logger.info(f"YT Music no lyrics for '{title}', trying Genius...")
-            genius_lines = _genius_lyrics(title, artist)
-            if genius_lines and len(genius_lines) >= 6:
-                logger.info(f"Genius found {len(genius_lines)} lines for '{title}'")
-                lines = genius_lines
-            else:
-                logger.warning(f"Genius also failed for '{title}' (token set: {bool(_get_genius_token())})")
-
-        if not lines or len(lines) < 6:
-            return None
+@dataclass
+class FetchedSong:
+    video_id: str
+    title: str
+    artist: str
+    thumbnail_url: str | None
+    lines: list[str]
+    language: str | None = None
 
-        language = language_override
-        if not language:
-            language = _detect_language(lines)
 
-        song = Song(title=title, artist=artist, yt_video_id=video_id,
-                    thumbnail_url=thumbs[-1]["url"] if thumbs else None, language=language)
-        db.add(song)
-        await db.flush()
-
-        for i, text in enumerate(lines):
-            db.add(Lyric(song_id=song.id, line_number=i, text=text))
-
-        await db.commit()
-        await db.refresh(song)
-        return song, len(lines)
-    except Exception as e:
-        logger.warning(f"Import failed for {video_id}: {e}")
-        await db.rollback()
+async def fetch_metadata(video_id: str) -> tuple[str, str, str | None] | None:
+    """(title, artist, thumbnail_url) from YT Music, or None when either name is unknown."""
+    details = (await yt.get_song(video_id)).get("videoDetails", {})
+    title = details.get("title", "Unknown")
+    artist = details.get("author", "Unknown")
+    if title.lower() in ("unknown", "") or artist.lower() in ("unknown", ""):
         return None
-
-
-async def auto_create_challenge(song_id: int, db: AsyncSession, count: int = 1) -> int:
-    """Pick the best non-overlapping snippets and create challenges. Returns number created."""
-    result = await db.execute(
-        select(Lyric).where(Lyric.song_id == song_id).order_by(Lyric.line_number)
-    )
-    lines = list(result.scalars())
+    thumbs = details.get("thumbnail", {}).get("thumbnails", [])
+    return title, artist, thumbs[-1]["url"] if thumbs else None
+
+
+async def fetch_lyrics(video_id: str, title: str, artist: str) -> list[str] | None:
+    """At least 6 non-empty lyric lines — YT Music first, then Genius."""
+    watch = await yt.get_watch_playlist(video_id)
+    lyrics_browse_id = watch.get("lyrics")
+    lines = None
+
+    # Try YT Music lyrics first
+    if lyrics_browse_id:
+        lyrics_data = await yt.get_lyrics(lyrics_browse_id)
+        if lyrics_data and lyrics_data.get("lyrics"):
+            raw = lyrics_data["lyrics"]
+            lines = [l for l in (raw.split("\n") if isinstance(raw, str) else [l.text for l in raw]) if l.strip()]
+
+    # Fallback to Genius
+    if not lines or len(lines) < 6:
+        logger.info(f"YT Music no lyrics for '{title}', trying Genius...")
+        genius_lines = await _genius_lyrics(title, artist)
+        if genius_lines and len(genius_lines) >= 6:
+            logger.info(f"Genius found {len(genius_lines)} lines for '{title}'")
+            lines = genius_lines
+        else:
+            logger.warning(f"Genius also failed for '{title}' (token set: {bool(_get_genius_token())})")
+
+    return lines if lines and len(lines) >= 6 else None
+
+
+def song_key(title: str, artist: str) -> tuple[str, str]:
+    return title.strip().lower(), artist.strip().lower()
+
+
+class KnownSongs:
+    """Video ids and normalized (title, artist) keys of stored songs.
+
+    Loaded with one query per job so candidates are checked in memory, before any
+    network fetch, instead of with two queries each.
+    """
+
+    def __init__(self):
+        self.video_ids: set[str] = set()
+        self.keys: set[tuple[str, str]] = set()
+
+    @classmethod
+    async def load(cls, db: AsyncSession) -> "KnownSongs":
+        known = cls()
+        for video_id, title, artist in await db.execute(select(Song.yt_video_id, Song.title, Song.artist)):
+            known.add(video_id, title, artist)
+        return known
+
+    def add(self, video_id: str, title: str, artist: str):
+        self.video_ids.add(video_id)
+        self.keys.add(song_key(title, artist))
+
+    def has(self, video_id: str | None, title: str, artist: str) -> bool:
+        return video_id in self.video_ids or song_key(title, artist) in self.keys
+
+
+def song_insert(fetched: FetchedSong, variants: list[str]):
+    """One statement writing the song, its lyrics row and its title variants; selects the new song id."""
+    song = insert(Song).values(
+        title=fetched.title, artist=fetched.artist, yt_video_id=fetched.video_id,
+        thumbnail_url=fetched.thumbnail_url, language=fetched.language,
+    ).returning(Song.id).cte("song")
+    lyrics = insert(SongLyrics).from_select(
+        ["song_id", "lines"], select(song.c.id, literal(fetched.lines, ARRAY(Text))),
+    ).cte("lyrics")
+    variant_rows = insert(SongTitleVariant).from_select(
+        ["song_id", "variant"], select(song.c.id, func.unnest(literal(variants, ARRAY(Text)))),
+    ).cte("variants")
+    return select(song.c.id).add_cte(lyrics, variant_rows)
+
+
+async def store_song(fetched: FetchedSong, db: AsyncSession) -> int:
+    """Insert a fetched song with its lyrics and title variants and return its id. Duplicates are the caller's to rule out."""
+    variants = title_variants(fetched.title)
+    song_id = (await db.execute(song_insert(fetched, variants))).scalar_one()
+    await db.commit()
+    title_index.add(song_id, variants)
+    autocomplete_index.add(song_id, fetched.title, fetched.artist, fetched.language)
+    response_cache.invalidate("languages")
+    return song_id
+
+
+async def auto_create_challenge(song_id: int, db: AsyncSession, count: int = 1, lines: list[str] | None = None) -> int:
+    """Pick the best non-overlapping snippets and create challenges. Returns number created.
+
+    `lines` saves re-reading lyrics the caller already has.
+    """
+    if lines is None:
+        lines = await all_lines(db, song_id)
+    lines = list(enumerate(lines))  # (line_number, text)
     if len(lines) < 6:
         return 0
 
@@ -211,43 +267,143 @@ async def auto_create_challenge(song_id: int, db: AsyncSession, count: int = 1)
     scored = []
     for i in range(len(candidates) - window + 1):
         chunk = candidates[i:i + window]
-        words = [w for l in chunk for w in l.text.split()]
+        words = [w for _, text in chunk for w in text.split()]
         unique_ratio = len(set(w.lower() for w in words)) / max(len(words), 1)
-        avg_len = sum(len(l.text) for l in chunk) / window
-        distinct_lines = len(set(l.text.lower().strip() for l in chunk))
+        avg_len = sum(len(text) for _, text in chunk) / window
+        distinct_lines = len(set(text.lower().strip() for _, text in chunk))
         if distinct_lines < 2:
             continue
         score = len(words) * unique_ratio * (avg_len / 30) * (distinct_lines / window)
-        scored.append((score, chunk[0].line_number, chunk[-1].line_number))
+        scored.append((score, chunk[0][0], chunk[-1][0]))
 
     scored.sort(reverse=True)
 
     # Pick top N non-overlapping
-    created = 0
     used_ranges = []
     for score, start, end in scored:
-        if created >= count:
+        if len(used_ranges) >= count:
             break
         if any(not (end < us or start > ue) for us, ue in used_ranges):
             continue  # overlaps
+        used_ranges.append((start, end))
+    if not used_ranges:
+        return 0
 
-        dup = await db.execute(
-            select(Challenge).where(Challenge.song_id == song_id, Challenge.start_line == start, Challenge.end_line == end)
-        )
-        if dup.scalar_one_or_none():
-            continue
+    # One multi-row insert; windows that already exist as challenges are skipped by the unique key
+    result = await db.execute(
+        insert(Challenge)
+        .values([dict(song_id=song_id, start_line=start, end_line=end) for start, end in used_ranges])
+        .on_conflict_do_nothing(index_elements=[Challenge.song_id, Challenge.start_line, Challenge.end_line])
+        .returning(Challenge.id, Challenge.start_line, Challenge.end_line)
+    )
+    new_challenges = [Challenge(id=cid, song_id=song_id, start_line=start, end_line=end) for cid, start, end in result]
+    if new_challenges:
+        # Precompute gameplay contexts from the lines already in hand
+        song = await db.get(Song, song_id)
+        text_by_line = dict(lines)
+        contexts = [build_context(challenge, song, text_by_line) for challenge in new_challenges]
+        columns = [c.key for c in ChallengeContext.__table__.columns]
+        await db.execute(insert(ChallengeContext).values([{c: getattr(ctx, c) for c in columns} for ctx in contexts]))
+    await db.commit()
+    if new_challenges:
+        sampler.invalidate()
+    return len(new_challenges)
+
+
+class StageStats:
+    """Items through one pipeline stage, for the throughput summary."""
+
+    def __init__(self, name: str, workers: int):
+        self.name = name
+        self.workers = workers
+        self.done = 0
+        self.busy = 0.0
+        self.started = time.monotonic()
+        self.elapsed = 0.0
+
+    def summary(self) -> str:
+        elapsed = max(self.elapsed or time.monotonic() - self.started, 1e-6)
+        return (f"{self.name}: {self.done} in {elapsed:.1f}s ({self.done / elapsed:.2f}/s, "
+                f"{self.workers} worker{'s' if self.workers > 1 else ''}, {self.busy / elapsed / self.workers:.0%} busy)")
+
+
+_DONE = object()
+
+
+class Stage:
+    """A bounded pool of workers handling items from `inbox` and passing non-None results to `next`."""
+
+    def __init__(self, name: str, workers: int, handle, on_error):
+        self.stats = StageStats(name, workers)
+        self.handle = handle
+        self.on_error = on_error
+        self.inbox: asyncio.Queue = asyncio.Queue(maxsize=workers * 2)
+        self.next: Stage | None = None
+        self._tasks = [asyncio.create_task(self._work()) for _ in range(workers)]
+
+    async def _work(self):
+        while (item := await self.inbox.get()) is not _DONE:
+            start = time.perf_counter()
+            try:
+                result = await self.handle(*item)
+            except Exception as e:
+                result = None
+                self.on_error(self.stats.name, item, e)
+            self.stats.busy += time.perf_counter() - start
+            self.stats.done += 1
+            if result is not None and self.next:
+                await self.next.inbox.put(result)
+
+    async def finish(self):
+        """Wait until everything queued so far has been handled, then stop the workers."""
+        for _ in self._tasks:
+            await self.inbox.put(_DONE)
+        await asyncio.gather(*self._tasks)
+        self.stats.elapsed = time.monotonic() - self.stats.started
+
+
+class _Progress:
+    """Job counters and log, kept in memory while stages run and saved to the job row by one writer."""
+
+    def __init__(self):
+        self.total_found = self.imported = self.skipped = self.failed = self.challenges_created = 0
+        self.lines: list[str] = []
+
+    def log(self, msg: str):
+        self.lines.append(msg)
+
+    def apply(self, job: BulkImportJob):
+        job.total_found, job.imported, job.skipped = self.total_found, self.imported, self.skipped
+        job.failed, job.challenges_created = self.failed, self.challenges_created
+        job.log = "".join(f"{line}\n" for line in self.lines)
 
-        db.add(Challenge(song_id=song_id, start_line=start, end_line=end))
-        used_ranges.append((start, end))
-        created += 1
 
-    if created:
+async def _save(job_id: int, db_factory, progress: _Progress, status: str | None = None):
+    async with db_factory() as db:
+        job = await db.get(BulkImportJob, job_id)
+        if not job:
+            return
+        progress.apply(job)
+        if status:
+            job.status = status
         await db.commit()
-    return created
+
+
+async def _report(job_id: int, db_factory, progress: _Progress):
+    while True:
+        await asyncio.sleep(PROGRESS_SECONDS)
+        try:
+            await _save(job_id, db_factory, progress)
+        except Exception as e:
+            logger.warning(f"Bulk import job {job_id} progress not saved: {e}")
 
 
 async def run_bulk_import(job_id: int, db_factory):
-    """Main orchestrator — runs as background task."""
+    """Main orchestrator — runs as background task.
+
+    Candidates flow through discover → fetch (metadata + lyrics) → detect (language) → write → challenges,
+    each stage with its own worker pool; YT Music and Genius calls are paced by their token buckets.
+    """
     async with db_factory() as db:
         job = await db.get(BulkImportJob, job_id)
         if not job:
@@ -255,69 +411,105 @@ async def run_bulk_import(job_id: int, db_factory):
         job.status = "running"
         job.log = ""
         await db.commit()
+        language, challenges_per_song = job.language, job.challenges_per_song
 
+    progress = _Progress()
+    reporter = asyncio.create_task(_report(job_id, db_factory, progress))
     try:
         # Discover
-        async with db_factory() as db:
-            job = await db.get(BulkImportJob, job_id)
-            _log(job, f"Discovering songs from {job.source}...")
-            await db.commit()
-
+        progress.log(f"Discovering songs from {job.source}...")
+        discover = StageStats("discover", 1)
         songs = await discover_ytmusic(
             language=job.language, count=job.requested_count,
             year_from=job.year_from, year_to=job.year_to, search_query=job.search_query,
         )
-
+        discover.done, discover.elapsed = len(songs), time.monotonic() - discover.started
+        discover.busy = discover.elapsed
+        progress.total_found = len(songs)
+        progress.log(f"Found {len(songs)} candidates")
+        n = len(songs)
         async with db_factory() as db:
-            job = await db.get(BulkImportJob, job_id)
-            job.total_found = len(songs)
-            _log(job, f"Found {len(songs)} candidates")
-            await db.commit()
-
-        # Import each
-        for i, s in enumerate(songs):
+            known = await KnownSongs.load(db)
+
+        async def fetch(i: int, s: dict):
+            meta = await fetch_metadata(s["video_id"])
+            if meta is None:
+                progress.failed += 1
+                progress.log(f"[{i+1}/{n}] Unknown title/artist: {s['title']}")
+                return None
+            title, artist, thumbnail_url = meta
+            if known.has(None, title, artist):  # same song under another video id
+                progress.skipped += 1
+                progress.log(f"[{i+1}/{n}] Skipped (exists): {s['title']}")
+                return None
+            lines = await fetch_lyrics(s["video_id"], title, artist)
+            if lines is None:
+                progress.failed += 1
+                progress.log(f"[{i+1}/{n}] No lyrics: {s['title']}")
+                return None
+            return i, FetchedSong(s["video_id"], title, artist, thumbnail_url, lines)
+
+        async def detect(i: int, fetched: FetchedSong):
+            fetched.language = language or await asyncio.to_thread(_detect_language, fetched.lines)
+            return i, fetched
+
+        async def write(i: int, fetched: FetchedSong):
+            # Re-checked here: two fetch workers may have let the same title through
+            if known.has(fetched.video_id, fetched.title, fetched.artist):
+                song_id = None
+            else:
+                try:
+                    async with db_factory() as db:
+                        song_id = await store_song(fetched, db)
+                except IntegrityError:
+                    song_id = None  # imported by someone else meanwhile
+                known.add(fetched.video_id, fetched.title, fetched.artist)
+            if song_id is None:
+                progress.skipped += 1
+                progress.log(f"[{i+1}/{n}] Skipped (exists): {fetched.title}")
+                return None
+            progress.imported += 1
+            progress.log(f"[{i+1}/{n}] Imported: {fetched.title} ({len(fetched.lines)} lines)")
+            return i, song_id, fetched.lines
+
+        async def challenges(i: int, song_id: int, lines: list[str]):
             async with db_factory() as db:
-                result = await import_single(s["video_id"], db, language_override=job.language)
-                job = await db.get(BulkImportJob, job_id)
-
-                if result is None:
-                    # Check if it was a duplicate vs no lyrics
-                    existing = await db.execute(select(Song).where(Song.yt_video_id == s["video_id"]))
-                    if existing.scalar_one_or_none():
-                        job.skipped += 1
-                        _log(job, f"[{i+1}/{len(songs)}] Skipped (exists): {s['title']}")
-                    else:
-                        job.failed += 1
-                        _log(job, f"[{i+1}/{len(songs)}] No lyrics: {s['title']}")
-                else:
-                    song, lc = result
-                    job.imported += 1
-                    _log(job, f"[{i+1}/{len(songs)}] Imported: {s['title']} ({lc} lines)")
-                    # Auto-create challenges
-                    ch = await auto_create_challenge(song.id, db, count=job.challenges_per_song)
-                    job.challenges_created += ch
-
-                await db.commit()
-            await asyncio.sleep(1)  # rate limit between imports
+                progress.challenges_created += await auto_create_challenge(song_id, db, challenges_per_song, lines)
+
+        def on_error(stage: str, item: tuple, e: Exception):
+            logger.warning(f"Bulk import {stage} failed: {e}")
+            if stage != "challenges":  # the song itself was imported and already counted
+                progress.failed += 1
+            progress.log(f"[{item[0]+1}/{n}] Failed in {stage}: {e}")
+
+        stages = [
+            Stage("fetch", FETCH_WORKERS, fetch, on_error),
+            Stage("detect", DETECT_WORKERS, detect, on_error),
+            Stage("write", 1, write, on_error),
+            Stage("challenges", CHALLENGE_WORKERS, challenges, on_error),
+        ]
+        for stage, nxt in zip(stages, stages[1:]):
+            stage.next = nxt
+        for i, s in enumerate(songs):
+            if known.has(s["video_id"], s["title"], s["artist"]):
+                progress.skipped += 1
+                progress.log(f"[{i+1}/{n}] Skipped (exists): {s['title']}")
+            else:
+                await stages[0].inbox.put((i, s))
+        for stage in stages:
+            await stage.finish()
 
-        async with db_factory() as db:
-            job = await db.get(BulkImportJob, job_id)
-            job.status = "completed"
-            _log(job, f"Done! Imported {job.imported}, skipped {job.skipped}, failed {job.failed}, challenges {job.challenges_created}")
-            await db.commit()
+        reporter.cancel()
+        progress.log(f"Done! Imported {progress.imported}, skipped {progress.skipped}, failed {progress.failed}, "
+                     f"challenges {progress.challenges_created}")
+        progress.log("Throughput — " + "; ".join(s.summary() for s in [discover, *(st.stats for st in stages)]))
+        await _save(job_id, db_factory, progress, status="completed")
 
     except Exception as e:
+        reporter.cancel()
         logger.error(f"Bulk import job {job_id} failed: {e}")
-        async with db_factory() as db:
-            job = await db.get(BulkImportJob, job_id)
-            if job:
-                job.status = "failed"
-                _log(job, f"ERROR: {e}")
-                await db.commit()
-
-
-def _log(job: BulkImportJob, msg: str):
-    job.log = (job.log or "") + msg + "\n"
+        progress.log(f"ERROR: {e}")
+        await _save(job_id, db_factory, progress, status="failed")
 
 
 def _detect_language(lines: list[str]) -> str:
@@ -0,0 +1,152 @@
+import os
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from sqlalchemy import select
+from sqlalchemy.exc import DBAPIError
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.models import Song, Challenge, ChallengeContext
+from app.services.lyrics_store import line_range
+from app.snapshot import snapshot
+
+MAX_ENTRIES = int(os.getenv("CHALLENGE_CACHE_SIZE", "10000"))
+# Entries are re-read after this long, so edits made by other workers show up
+TTL_SECONDS = float(os.getenv("CHALLENGE_CACHE_TTL_SECONDS", "300"))
+
+
+@dataclass(frozen=True, slots=True)
+class CachedChallenge:
+    challenge_id: int
+    song_id: int
+    lines: tuple[str, ...]
+    before: tuple[str, ...]
+    after: tuple[str, ...]
+    title: str
+    artist: str
+    album: str | None
+    thumbnail_url: str | None
+    is_active: bool = True
+
+    @classmethod
+    def from_row(cls, ctx: ChallengeContext, is_active: bool) -> "CachedChallenge":
+        return cls(
+            challenge_id=ctx.challenge_id, song_id=ctx.song_id, lines=tuple(ctx.lines), before=tuple(ctx.before), after=tuple(ctx.after),
+            title=ctx.title, artist=ctx.artist, album=ctx.album, thumbnail_url=ctx.thumbnail_url, is_active=is_active,
+        )
+
+
+def _contexts():
+    return select(ChallengeContext, Challenge.is_active).join(Challenge, Challenge.id == ChallengeContext.challenge_id)
+
+
+def build_context(challenge: Challenge, song: Song, text_by_line: dict[int, str]) -> ChallengeContext:
+    """Build the context row from the lyric lines around a challenge (start-1 .. end+1)."""
+    before, after = challenge.start_line - 1, challenge.end_line + 1
+    return ChallengeContext(
+        challenge_id=challenge.id, song_id=challenge.song_id,
+        lines=[text_by_line[n] for n in range(challenge.start_line, challenge.end_line + 1) if n in text_by_line],
+        before=[text_by_line[before]] if before in text_by_line else [],
+        after=[text_by_line[after]] if after in text_by_line else [],
+        title=song.title, artist=song.artist, album=song.album, thumbnail_url=song.thumbnail_url,
+    )
+
+
+async def refresh_context(challenge: Challenge, db: AsyncSession) -> ChallengeContext | None:
+    """Recompute and stage the context row for one challenge. Caller commits."""
+    song = await db.get(Song, challenge.song_id)
+    if not song:
+        return None
+    text_by_line = await line_range(db, challenge.song_id, challenge.start_line - 1, challenge.end_line + 1)
+    ctx = await db.merge(build_context(challenge, song, text_by_line))
+    cache.discard(challenge.id)
+    return ctx
+
+
+class ChallengeCache:
+    """Bounded LRU of challenge contexts keyed by challenge id, each entry kept for ttl seconds.
+
+    Entries carry the challenge's is_active flag; with active_only, deactivated
+    challenges read as missing, as they do to the sampler.
+    """
+
+    def __init__(self, max_entries: int = MAX_ENTRIES, ttl: float = TTL_SECONDS):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self._entries: OrderedDict[int, tuple[float, CachedChallenge]] = OrderedDict()
+
+    def _cached(self, challenge_id: int) -> CachedChallenge | None:
+        item = self._entries.get(challenge_id)
+        if item is None:
+            return None
+        expires, entry = item
+        if time.monotonic() >= expires:
+            del self._entries[challenge_id]
+            return None
+        self._entries.move_to_end(challenge_id)
+        return entry
+
+    async def get(self, challenge_id: int, db: AsyncSession, active_only: bool = False) -> CachedChallenge | None:
+        entry = self._cached(challenge_id) or await self._load(challenge_id, db)
+        if entry is None or (active_only and not entry.is_active):
+            return None
+        return entry
+
+    async def _load(self, challenge_id: int, db: AsyncSession) -> CachedChallenge | None:
+        if snapshot is not None:
+            row = snapshot.challenge(challenge_id)
+            return self._put(CachedChallenge(**row)) if row else None
+
+        row = (await db.execute(_contexts().where(ChallengeContext.challenge_id == challenge_id))).first()
+        if row is None:
+            # Challenges created before contexts existed are backfilled on first use
+            challenge = await db.get(Challenge, challenge_id)
+            if not challenge:
+                return None
+            ctx = await refresh_context(challenge, db)
+            if ctx is None:
+                return None
+            entry = CachedChallenge.from_row(ctx, challenge.is_active)
+            try:
+                await db.commit()
+            except DBAPIError:
+                # Read-only (replica) session — serve it anyway; a primary session stores it later
+                await db.rollback()
+            return self._put(entry)
+        return self._put(CachedChallenge.from_row(*row))
+
+    async def get_many(self, challenge_ids: list[int], db: AsyncSession,
+                       active_only: bool = False) -> dict[int, CachedChallenge]:
+        """Like get(), but loads every cache miss with a single query."""
+        found: dict[int, CachedChallenge] = {}
+        missing = []
+        for challenge_id in challenge_ids:
+            entry = self._cached(challenge_id)
+            if entry is not None:
+                found[challenge_id] = entry
+            else:
+                missing.append(challenge_id)
+        if missing and snapshot is None:
+            result = await db.execute(_contexts().where(ChallengeContext.challenge_id.in_(missing)))
+            for ctx, is_active in result:
+                found[ctx.challenge_id] = self._put(CachedChallenge.from_row(ctx, is_active))
+        for challenge_id in missing:
+            if challenge_id not in found and (entry := await self._load(challenge_id, db)):
+                found[challenge_id] = entry
+        if active_only:
+            found = {cid: entry for cid, entry in found.items() if entry.is_active}
+        return found
+
+    def _put(self, entry: CachedChallenge) -> CachedChallenge:
+        self._entries[entry.challenge_id] = (time.monotonic() + self.ttl, entry)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+        return entry
+
+    def discard(self, challenge_id: int):
+        self._entries.pop(challenge_id, None)
+
+    def clear(self):
+        self._entries.clear()
+
+
+cache = ChallengeCache()
@@ -0,0 +1,148 @@
+import asyncio
+import os
+import random
+import time
+from collections.abc import Container
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.models import Song, Challenge
+from app.snapshot import snapshot
+
+REFRESH_SECONDS = float(os.getenv("SAMPLER_REFRESH_SECONDS", "300"))
+MAX_REJECTIONS = 32  # O(1) draws before falling back to a linear pick over what's left
+
+
+def year_weight(year: int | None) -> int:
+    """Weight newer songs higher: year 2025+ → 5, 2022-2024 → 3, older/unknown → 1."""
+    if year is None:
+        return 1
+    if year >= 2025:
+        return 5
+    if year >= 2022:
+        return 3
+    return 1
+
+
+class AliasTable:
+    """Walker/Vose alias table — O(n) build, O(1) weighted draw."""
+
+    def __init__(self, ids: list[int], weights: list[int]):
+        n = len(ids)
+        self.ids = ids
+        self.weights = weights
+        self.prob = [1.0] * n
+        self.alias = list(range(n))
+        if not n:
+            return
+        total = sum(weights)
+        scaled = [w * n / total for w in weights]
+        small = [i for i, p in enumerate(scaled) if p < 1]
+        large = [i for i, p in enumerate(scaled) if p >= 1]
+        while small and large:
+            s, l = small.pop(), large.pop()
+            self.prob[s] = scaled[s]
+            self.alias[s] = l
+            scaled[l] -= 1 - scaled[s]
+            (small if scaled[l] < 1 else large).append(l)
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    def draw(self) -> int:
+        i = random.randrange(len(self.ids))
+        return self.ids[i] if random.random() < self.prob[i] else self.ids[self.alias[i]]
+
+    def sample(self, exclude: Container[int] = ()) -> int | None:
+        """Weighted draw skipping excluded ids, without rebuilding the table."""
+        picked = self.sample_many(1, exclude)
+        return picked[0] if picked else None
+
+    def sample_many(self, n: int, exclude: Container[int] = ()) -> list[int]:
+        """Up to n distinct weighted draws skipping excluded ids."""
+        picked: list[int] = []
+        if not self.ids:
+            return picked
+        chosen = set()
+        for _ in range(n * MAX_REJECTIONS):
+            if len(picked) >= n:
+                return picked
+            cid = self.draw()
+            if cid not in exclude and cid not in chosen:
+                chosen.add(cid)
+                picked.append(cid)
+        if len(picked) < n:
+            # Almost everything is excluded — weighted pick without replacement from the remainder
+            remaining = [(cid, w) for cid, w in zip(self.ids, self.weights) if cid not in exclude and cid not in chosen]
+            remaining.sort(key=lambda p: random.random() ** (1 / p[1]), reverse=True)
+            picked.extend(cid for cid, _ in remaining[:n - len(picked)])
+        return picked
+
+
+class ChallengeSampler:
+    """Per-language alias tables over active challenge ids, keyed by language (None = all)."""
+
+    def __init__(self):
+        self._tables: dict[str | None, AliasTable] = {}
+        self._built_at = float("-inf")
+        self._generation = 0
+        self._lock = asyncio.Lock()
+
+    def invalidate(self):
+        """Mark tables stale; the next draw rebuilds them."""
+        self._generation += 1
+        self._built_at = float("-inf")
+
+    def _fresh(self) -> bool:
+        return time.monotonic() - self._built_at < REFRESH_SECONDS
+
+    async def rebuild(self, db: AsyncSession):
+        async with self._lock:
+            await self._build(db)
+
+    async def _build(self, db: AsyncSession):
+        generation = self._generation
+        if snapshot is not None:
+            result = snapshot.sampler_rows()
+        else:
+            result = await db.execute(
+                select(Challenge.id, Song.language, Song.year)
+                .join(Song, Challenge.song_id == Song.id)
+                .where(Challenge.is_active == True)
+            )
+        groups: dict[str | None, tuple[list[int], list[int]]] = {None: ([], [])}
+        for cid, language, year in result:
+            w = year_weight(year)
+            keys = (None, language) if language else (None,)
+            for key in keys:
+                ids, weights = groups.setdefault(key, ([], []))
+                ids.append(cid)
+                weights.append(w)
+        self._tables = {key: AliasTable(ids, weights) for key, (ids, weights) in groups.items()}
+        # An invalidate() that raced with this build leaves the tables stale
+        if generation == self._generation:
+            self._built_at = time.monotonic()
+
+    async def _ensure_fresh(self, db: AsyncSession):
+        if self._fresh():
+            return
+        async with self._lock:
+            if not self._fresh():
+                await self._build(db)
+
+    async def sample(self, db: AsyncSession, language: str | None = None, exclude: Container[int] = ()) -> int | None:
+        picked = await self.sample_many(db, 1, language, exclude)
+        return picked[0] if picked else None
+
+    async def sample_many(self, db: AsyncSession, n: int, language: str | None = None, exclude: Container[int] = ()) -> list[int]:
+        await self._ensure_fresh(db)
+        table = self._tables.get(language.lower() if language else None)
+        return table.sample_many(n, exclude) if table else []
+
+    async def ids(self, db: AsyncSession, language: str | None = None) -> list[int]:
+        """Every active challenge id in a language (None = all)."""
+        await self._ensure_fresh(db)
+        table = self._tables.get(language.lower() if language else None)
+        return table.ids if table else []
+
+
+sampler = ChallengeSampler()
@@ -0,0 +1,98 @@
+import asyncio
+import hashlib
+import logging
+import os
+from dataclasses import dataclass
+from datetime import date, datetime, timedelta, timezone
+from sqlalchemy import select
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.models import Song, DailyChallenge
+from app.schemas import DailyChallengeOut, GameChallenge
+from app.services.challenge_sampler import sampler
+from app.services.challenge_cache import cache as challenge_cache
+
+logger = logging.getLogger(__name__)
+
+DAILY_COUNT = int(os.getenv("DAILY_CHALLENGE_COUNT", "5"))
+ALL_LANGUAGES = "all"
+
+
+@dataclass(frozen=True, slots=True)
+class DailyPayload:
+    body: bytes
+    etag: str
+
+
+_payloads: dict[tuple[date, str], DailyPayload] = {}
+_lock = asyncio.Lock()
+
+
+def today() -> date:
+    return datetime.now(timezone.utc).date()
+
+
+def seconds_until_rollover() -> int:
+    now = datetime.now(timezone.utc)
+    midnight = datetime.combine(now.date() + timedelta(days=1), datetime.min.time(), timezone.utc)
+    return max(1, int((midnight - now).total_seconds()))
+
+
+async def get_daily(db: AsyncSession, language: str | None = None, day: date | None = None) -> DailyPayload | None:
+    """Return the day's puzzle set, generating and persisting it on first request."""
+    day = day or today()
+    key = (day, language.lower() if language else ALL_LANGUAGES)
+    payload = _payloads.get(key)
+    if payload:
+        return payload
+
+    # Single-flight: the rollover burst waits on one generation instead of racing it
+    async with _lock:
+        payload = _payloads.get(key)
+        if payload:
+            return payload
+        row = await db.get(DailyChallenge, key)
+        if row is None:
+            row = await _generate(db, *key)
+            if row is None:
+                return None
+        payload = DailyPayload(body=row.payload.encode(), etag=row.etag)
+        for stale in [k for k in _payloads if k[0] < today()]:
+            del _payloads[stale]
+        _payloads[key] = payload
+        return payload
+
+
+async def _generate(db: AsyncSession, day: date, language: str) -> DailyChallenge | None:
+    ids = await sampler.sample_many(db, DAILY_COUNT, None if language == ALL_LANGUAGES else language)
+    contexts = await challenge_cache.get_many(ids, db, active_only=True)
+    challenges = [GameChallenge(challenge_id=cid, lines=list(contexts[cid].lines)) for cid in ids if cid in contexts]
+    if not challenges:
+        return None
+
+    body = DailyChallengeOut(
+        date=day.isoformat(), language=None if language == ALL_LANGUAGES else language, challenges=challenges,
+    ).model_dump_json()
+    etag = hashlib.sha256(body.encode()).hexdigest()[:32]
+    # Another worker may have won the race — its row is the one everybody serves
+    await db.execute(
+        insert(DailyChallenge).values(day=day, language=language, payload=body, etag=etag)
+        .on_conflict_do_nothing(index_elements=["day", "language"])
+    )
+    await db.commit()
+    return await db.get(DailyChallenge, (day, language))
+
+
+async def prepare_daily(db_factory, interval: int = 3600):
+    """Background loop: keep today's and tomorrow's sets ready ahead of the rollover burst."""
+    while True:
+        try:
+            async with db_factory() as db:
+                result = await db.execute(select(Song.language).where(Song.language.isnot(None)).distinct())
+                languages = [None] + [r[0] for r in result]
+                for day in (today(), today() + timedelta(days=1)):
+                    for language in languages:
+                        await get_daily(db, language, day)
+        except Exception as e:
+            logger.warning(f"Daily challenge preparation failed: {e}")
+        await asyncio.sleep(interval)
@@ -0,0 +1,154 @@
+import asyncio
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+import zlib
+from pathlib import Path
+
+# On-disk cache of YT Music / Genius responses, shared by the API and the webscraper.
+# Set FETCH_CACHE_PATH="" to disable it.
+CACHE_PATH = os.getenv("FETCH_CACHE_PATH", str(Path(__file__).resolve().parents[2] / "fetch_cache.sqlite"))
+MAX_BYTES = int(os.getenv("FETCH_CACHE_MAX_MB", "512")) * 1024 * 1024
+NEGATIVE_TTL = float(os.getenv("FETCH_CACHE_NEGATIVE_SECONDS", str(3 * 86400)))
+# Serve only what's cached — a miss raises instead of going to the network (offline runs and tests)
+OFFLINE = os.getenv("FETCH_CACHE_OFFLINE", "").lower() in ("1", "true", "yes")
+
+DAY = 86400
+# Seconds a response stays fresh, per endpoint; override with e.g. FETCH_CACHE_TTLS="search=3600,lyrics=604800"
+TTLS = {"search": 1 * DAY, "song": 30 * DAY, "watch": 7 * DAY, "lyrics": 90 * DAY, "genius": 30 * DAY}
+for _item in filter(None, os.getenv("FETCH_CACHE_TTLS", "").split(",")):
+    _endpoint, _, _ttl = _item.partition("=")
+    TTLS[_endpoint.strip()] = float(_ttl)
+
+
+class CacheMiss(LookupError):
+    """Raised on a miss in offline mode."""
+
+
+class FetchCache:
+    """Content-addressed SQLite store of upstream responses, keyed by a hash of (endpoint, args).
+
+    Values are zlib-compressed JSON. Empty results ("no lyrics") are kept for the shorter
+    negative TTL so they're retried sooner. Past max_bytes, expired entries go first and
+    then the least recently used, down to 90% of the limit.
+    """
+
+    def __init__(self, path: str, max_bytes: int = MAX_BYTES, ttls: dict[str, float] = TTLS,
+                 negative_ttl: float = NEGATIVE_TTL, offline: bool = OFFLINE):
+        self.path = path
+        self.max_bytes = max_bytes
+        self.ttls = ttls
+        self.negative_ttl = negative_ttl
+        self.offline = offline
+        self.stats = {"hits": 0, "misses": 0, "negative_hits": 0, "evicted": 0}
+        self._lock = threading.Lock()
+        self._conn: sqlite3.Connection | None = None
+        self._size = 0
+
+    def _open(self) -> sqlite3.Connection:
+        """The file is created on first use, not at import. Call with the lock held."""
+        if self._conn is None:
+            conn = sqlite3.connect(self.path, check_same_thread=False)
+            conn.execute("PRAGMA journal_mode = WAL")
+            conn.execute("PRAGMA synchronous = NORMAL")
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS responses (key TEXT PRIMARY KEY, endpoint TEXT NOT NULL, "
+                "value BLOB NOT NULL, negative INTEGER NOT NULL, size INTEGER NOT NULL, "
+                "expires REAL NOT NULL, used REAL NOT NULL)"
+            )
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_responses_used ON responses (used)")
+            conn.commit()
+            self._conn = conn
+            self._size = self._total_size()
+        return self._conn
+
+    @staticmethod
+    def key(endpoint: str, args: tuple) -> str:
+        return hashlib.sha256(json.dumps([endpoint, *args], ensure_ascii=False).encode()).hexdigest()
+
+    def get(self, endpoint: str, args: tuple) -> tuple[bool, object]:
+        """(True, value) on a fresh hit, else (False, None)."""
+        if not self.path:
+            return False, None
+        key, now = self.key(endpoint, args), time.time()
+        with self._lock:
+            conn = self._open()
+            row = conn.execute("SELECT value, negative FROM responses WHERE key = ? AND expires > ?",
+                               (key, now)).fetchone()
+            if row is None:
+                self.stats["misses"] += 1
+                return False, None
+            conn.execute("UPDATE responses SET used = ? WHERE key = ?", (now, key))
+            conn.commit()
+            self.stats["hits"] += 1
+            self.stats["negative_hits"] += row[1]
+        return True, json.loads(zlib.decompress(row[0]))
+
+    def put(self, endpoint: str, args: tuple, value, negative: bool | None = None):
+        if not self.path:
+            return
+        negative = not value if negative is None else negative
+        ttl = self.negative_ttl if negative else self.ttls.get(endpoint, 0)
+        if ttl <= 0:
+            return
+        blob = zlib.compress(json.dumps(value, ensure_ascii=False).encode())
+        key, now = self.key(endpoint, args), time.time()
+        with self._lock:
+            conn = self._open()
+            old = conn.execute("SELECT size FROM responses WHERE key = ?", (key,)).fetchone()
+            conn.execute("INSERT OR REPLACE INTO responses VALUES (?, ?, ?, ?, ?, ?, ?)",
+                         (key, endpoint, blob, int(negative), len(blob), now + ttl, now))
+            self._size += len(blob) - (old[0] if old else 0)
+            if self._size > self.max_bytes:
+                self._evict(now)
+            conn.commit()
+
+    def _evict(self, now: float):
+        target = self.max_bytes * 0.9
+        self.stats["evicted"] += self._conn.execute("DELETE FROM responses WHERE expires <= ?", (now,)).rowcount
+        self._size = self._total_size()
+        while self._size > target:
+            rows = self._conn.execute("SELECT key, size FROM responses ORDER BY used LIMIT 100").fetchall()
+            if not rows:
+                break
+            for key, size in rows:
+                if self._size <= target:
+                    break
+                self._conn.execute("DELETE FROM responses WHERE key = ?", (key,))
+                self._size -= size
+                self.stats["evicted"] += 1
+
+    def _total_size(self) -> int:
+        return self._conn.execute("SELECT COALESCE(SUM(size), 0) FROM responses").fetchone()[0]
+
+    def cached(self, endpoint: str, args: tuple, fetch, negative=None):
+        """Cached `fetch()`; `negative(value)` says whether a result means "nothing there"."""
+        hit, value = self.get(endpoint, args)
+        if hit:
+            return value
+        if self.offline:
+            raise CacheMiss(f"{endpoint} {args} not cached")
+        value = fetch()
+        self.put(endpoint, args, value, negative(value) if negative else None)
+        return value
+
+    async def acached(self, endpoint: str, args: tuple, fetch, negative=None):
+        """Like cached(), for a coroutine function `fetch`. SQLite reads and writes (and any
+        eviction) run on a worker thread so a slow disk never stalls the event loop."""
+        hit, value = await asyncio.to_thread(self.get, endpoint, args)
+        if hit:
+            return value
+        if self.offline:
+            raise CacheMiss(f"{endpoint} {args} not cached")
+        value = await fetch()
+        await asyncio.to_thread(self.put, endpoint, args, value, negative(value) if negative else None)
+        return value
+
+    def metrics(self) -> dict:
+        return {**self.stats, "path": self.path, "bytes": self._size, "max_bytes": self.max_bytes, "offline": self.offline}
+
+
+cache = FetchCache(CACHE_PATH)
@@ -1,29 +1,26 @@
-import re
-import unicodedata
-from difflib import SequenceMatcher
 from urllib.parse import quote_plus
+from app.services.title_matcher import HIGH, LOW, score
+from app.services.title_index import index as title_index
 
 
-def normalize_text(text: str) -> str:
-    text = unicodedata.normalize("NFKD", text).lower()
-    text = re.sub(r"[^\w\s]", "", text)
-    return re.sub(r"\s+", " ", text).strip()
-
-
-def similarity(guess: str, title: str) -> float:
-    return SequenceMatcher(None, normalize_text(guess), normalize_text(title)).ratio()
-
-
-def check_guess(guess: str, title: str) -> dict:
+async def check_guess(guess: str, title: str, challenge_id: int | None = None, song_id: int | None = None) -> dict:
     """Returns {correct, near_match, suggestion, message}."""
-    s = similarity(guess, title)
-    if s >= 0.9:
+    s = score(guess, title, challenge_id, await title_index.variants(song_id))
+    if s >= HIGH:
         return {"correct": True, "near_match": False, "suggestion": None, "message": "Correct! 🎉"}
-    if s >= 0.6:
+    if s >= LOW and await _is_nearest(guess, song_id, s):
         return {"correct": False, "near_match": True, "suggestion": title, "message": f"Did you mean: {title}?"}
     return {"correct": False, "near_match": False, "suggestion": None, "message": "Not quite — try again or ask for a hint!"}
 
 
+async def _is_nearest(guess: str, song_id: int | None, s: float) -> bool:
+    """A close match is only a near miss if no other song's title is closer to the guess."""
+    if song_id is None or song_id not in title_index:
+        return True
+    nearest = await title_index.nearest(guess)
+    return nearest is None or nearest[0] == song_id or nearest[2] <= s
+
+
 def platform_urls(artist: str, title: str) -> dict[str, str]:
     q = quote_plus(f"{artist} {title}")
     return {
@@ -0,0 +1,404 @@
+import os
+import time
+from collections import OrderedDict
+from bisect import bisect_left, insort
+from datetime import datetime, timezone
+from sqlalchemy import Boolean, and_, delete, exists, func, literal, literal_column, or_, select, text, true, union_all, update
+from sqlalchemy.dialects.postgresql import array, insert
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import aliased
+from app.models import Challenge, Score, ScoreRollup, Song, User, UserTotal
+from app.services.response_cache import cache as response_cache
+
+TOP_N = int(os.getenv("LEADERBOARD_TOP_N", "100"))
+REFRESH_SECONDS = int(os.getenv("LEADERBOARD_REFRESH_SECONDS", "30"))
+RANK_REFRESH_SECONDS = int(os.getenv("LEADERBOARD_RANK_REFRESH_SECONDS", "300"))
+# Per-language boards kept in memory; the least recently read are dropped past this
+MAX_BOARDS = int(os.getenv("LEADERBOARD_MAX_BOARDS", "64"))
+
+ALL = "all"
+PERIODS = ("day", "week", ALL)
+
+
+def period_key(period: str, now: datetime | None = None) -> str:
+    """Bucket key of the current day/week, matching the keys _rollup_rows() computes in SQL."""
+    if period == ALL:
+        return ALL
+    d = (now or datetime.now(timezone.utc)).date()
+    if period == "day":
+        return d.isoformat()
+    year, week, _ = d.isocalendar()
+    return f"{year}-W{week:02d}"
+
+
+def _rollup_rows(rows):
+    """(period, language, user_id, points, games_played) per bucket for score rows.
+
+    `rows` has user_id, challenge_id, points, games (+1 per game, -1 to take one back)
+    and scored_at. Each row lands in the day and ISO week of its scored_at and all-time,
+    both under its song's language and under "all" — except all-time/"all", which is
+    user_totals. Buckets whose changes cancel out are left alone.
+    """
+    scored = (
+        select(rows.c.user_id, rows.c.points, rows.c.games, Song.language,
+               func.timezone("UTC", rows.c.scored_at).label("ts"))
+        .join(Challenge, Challenge.id == rows.c.challenge_id)
+        .join(Song, Song.id == Challenge.song_id)
+        .subquery("scored")
+    )
+    periods = func.unnest(array([
+        func.to_char(scored.c.ts, "YYYY-MM-DD"), func.to_char(scored.c.ts, 'IYYY-"W"IW'), literal(ALL),
+    ])).table_valued("period", joins_implicitly=True).render_derived(name="p")
+    languages = func.unnest(array([scored.c.language, literal(ALL)])) \
+        .table_valued("language", joins_implicitly=True).render_derived(name="l")
+    points, games = func.sum(scored.c.points), func.sum(scored.c.games)
+    return (
+        select(periods.c.period, languages.c.language, scored.c.user_id,
+               points.label("points"), games.label("games_played"))
+        .select_from(scored).join(periods, true()).join(languages, true())
+        .where(languages.c.language.is_not(None), or_(periods.c.period != ALL, languages.c.language != ALL))
+        .group_by(periods.c.period, languages.c.language, scored.c.user_id)
+        .having(or_(points != 0, games != 0))
+    )
+
+
+def _scores(*where):
+    return select(Score.user_id, Score.challenge_id, Score.points, literal_column("1").label("games"),
+                  Score.scored_at).where(*where).subquery()
+
+
+def with_totals(score_stmt):
+    """Fold a score upsert into user_totals and score_rollups within the same statement.
+
+    The upsert's RETURNING gives each row it inserted or updated. Points only ever go
+    from 0 to their final value (a guess is scored once), so the returned points are
+    the delta, and a freshly inserted row is one more game played. Rows skipped by
+    ON CONFLICT aren't returned and change nothing.
+
+    Rollups follow scored_at, as retract_scores() and rebuild_totals() do: an updated
+    row's game (and any earlier points) leaves the bucket of its old scored_at, read
+    from `scores` in the same statement — which still sees the row as it was — and
+    lands with its points in the bucket of the new one. A hint yesterday and a guess
+    today is a game played today. Yields the new
+    (user_id, total_points, games_played, gained_points, gained_games) of every user touched.
+    """
+    s = score_stmt.returning(
+        Score.user_id, Score.challenge_id, Score.points, Score.scored_at,
+        literal_column("(xmax = 0)", Boolean).label("inserted"),
+    ).cte("s")
+
+    old = aliased(Score, name="old")
+    keys = and_(old.user_id == s.c.user_id, old.challenge_id == s.c.challenge_id)
+    moves = union_all(
+        select(s.c.user_id, s.c.challenge_id, (s.c.points - func.coalesce(old.points, 0)).label("points"),
+               literal_column("1").label("games"), s.c.scored_at)
+        .select_from(s.outerjoin(old, keys)),
+        select(old.user_id, old.challenge_id, -old.points, literal_column("-1"), old.scored_at)
+        .select_from(s.join(old, keys)),
+    ).subquery("moves")
+
+    rollups = insert(ScoreRollup).from_select(
+        ["period", "language", "user_id", "points", "games_played"], _rollup_rows(moves),
+    )
+    rollups = rollups.on_conflict_do_update(
+        index_elements=[ScoreRollup.period, ScoreRollup.language, ScoreRollup.user_id],
+        set_={
+            "points": ScoreRollup.points + rollups.excluded.points,
+            "games_played": ScoreRollup.games_played + rollups.excluded.games_played,
+        },
+    ).cte("rollups")
+
+    delta = (
+        select(s.c.user_id, func.sum(s.c.points).label("points"), func.count().filter(s.c.inserted).label("games"))
+        .group_by(s.c.user_id)
+        .cte("delta")
+    )
+    stmt = insert(UserTotal).from_select(["user_id", "total_points", "games_played"], select(delta))
+    totals = stmt.on_conflict_do_update(
+        index_elements=[UserTotal.user_id],
+        set_={
+            "total_points": UserTotal.total_points + stmt.excluded.total_points,
+            "games_played": UserTotal.games_played + stmt.excluded.games_played,
+        },
+    ).returning(UserTotal.user_id, UserTotal.total_points, UserTotal.games_played).cte("totals")
+
+    return (
+        select(totals.c.user_id, totals.c.total_points, totals.c.games_played, delta.c.points, delta.c.games)
+        .join(delta, delta.c.user_id == totals.c.user_id)
+        .add_cte(rollups)
+    )
+
+
+async def retract_scores(db: AsyncSession, challenge_ids):
+    """Take the scores of challenges about to be deleted out of the aggregates. Caller commits."""
+    gone = (
+        select(Score.user_id, func.sum(Score.points).label("points"), func.count().label("games"))
+        .where(Score.challenge_id.in_(challenge_ids))
+        .group_by(Score.user_id)
+        .subquery()
+    )
+    await db.execute(
+        update(UserTotal)
+        .where(UserTotal.user_id == gone.c.user_id)
+        .values(total_points=UserTotal.total_points - gone.c.points,
+                games_played=UserTotal.games_played - gone.c.games)
+        .execution_options(synchronize_session=False)
+    )
+    b = _rollup_rows(_scores(Score.challenge_id.in_(challenge_ids))).subquery()
+    await db.execute(
+        update(ScoreRollup)
+        .where(and_(ScoreRollup.period == b.c.period, ScoreRollup.language == b.c.language,
+                    ScoreRollup.user_id == b.c.user_id))
+        .values(points=ScoreRollup.points - b.c.points, games_played=ScoreRollup.games_played - b.c.games_played)
+        .execution_options(synchronize_session=False)
+    )
+    invalidate()
+
+
+async def rebuild_totals(db: AsyncSession):
+    """Recompute user_totals and score_rollups from scores. Score writers wait on the table locks meanwhile."""
+    await db.execute(text("LOCK TABLE user_totals, score_rollups IN EXCLUSIVE MODE"))
+    await db.execute(delete(UserTotal))
+    await db.execute(delete(ScoreRollup))
+    await db.execute(
+        insert(UserTotal).from_select(
+            ["user_id", "total_points", "games_played"],
+            select(Score.user_id, func.sum(Score.points), func.count()).group_by(Score.user_id),
+        )
+    )
+    await db.execute(
+        insert(ScoreRollup).from_select(
+            ["period", "language", "user_id", "points", "games_played"], _rollup_rows(_scores()),
+        )
+    )
+    await db.commit()
+    invalidate()
+
+
+async def ensure_totals(db: AsyncSession):
+    """First start after upgrading: build the aggregates if scores exist but they're empty."""
+    empty = not (await db.execute(select(exists().select_from(UserTotal)))).scalar() \
+        or not (await db.execute(select(exists().select_from(ScoreRollup)))).scalar()
+    if empty and (await db.execute(select(exists().select_from(Score)))).scalar():
+        await rebuild_totals(db)
+
+
+class FenwickTree:
+    """Number of users per points value, with O(log n) "how many users have more than x"."""
+
+    def __init__(self, counts: dict[int, int] | None = None):
+        counts = counts or {}
+        size = 1024
+        while size <= max(counts, default=0):
+            size *= 2
+        self._build([counts.get(v, 0) for v in range(size)])
+
+    def _build(self, counts: list[int]):
+        self._counts = counts
+        self._tree = [0] + counts
+        n = len(counts)
+        for i in range(1, n + 1):
+            j = i + (i & -i)
+            if j <= n:
+                self._tree[j] += self._tree[i]
+        self.total = sum(counts)
+
+    def add(self, value: int, delta: int = 1):
+        value = max(value, 0)
+        if value >= len(self._counts):
+            size = len(self._counts)
+            while size <= value:
+                size *= 2
+            self._build(self._counts + [0] * (size - len(self._counts)))
+        self._counts[value] += delta
+        self.total += delta
+        i = value + 1
+        while i < len(self._tree):
+            self._tree[i] += delta
+            i += i & -i
+
+    def at_most(self, value: int) -> int:
+        i, n = min(value + 1, len(self._counts)), 0
+        while i > 0:
+            n += self._tree[i]
+            i -= i & -i
+        return n
+
+    def above(self, value: int) -> int:
+        return self.total - self.at_most(value)
+
+
+class Leaderboard:
+    """Top-N users of one (period, language) bucket, kept sorted in memory.
+
+    The all-time board reads user_totals and also takes own score writes in place;
+    bucket boards read score_rollups. Either way a refresh is a LIMIT query on the
+    bucket's points index. Ranks come from a Fenwick tree over the bucket's points
+    histogram (users with more points + 1, so ties share a rank), and "around me"
+    pages are two short index scans either side of the user.
+    """
+
+    def __init__(self, period: str = ALL, language: str = ALL, size: int = TOP_N,
+                 refresh_seconds: int = REFRESH_SECONDS, rank_refresh_seconds: int = RANK_REFRESH_SECONDS):
+        self.period = period
+        self.language = language
+        self.size = size
+        self.refresh_seconds = refresh_seconds
+        self.rank_refresh_seconds = rank_refresh_seconds
+        self._keys: list[tuple[int, int]] = []  # sorted (-total_points, user_id)
+        self._entries: dict[int, dict] = {}
+        self._loaded_at: float | None = None
+        self._ranks: FenwickTree | None = None
+        self._ranks_loaded_at = 0.0
+
+    def invalidate(self):
+        self._loaded_at = None
+        self._ranks = None
+
+    def apply(self, totals) -> bool:
+        """Apply (user_id, total_points, games_played, gained_points, gained_games) rows from with_totals().
+
+        True when the top N changed.
+        """
+        changed = False
+        for user_id, total_points, games_played, gained_points, gained_games in totals:
+            if self._ranks is not None:
+                if games_played - gained_games > 0:
+                    self._ranks.add(total_points - gained_points, -1)
+                if games_played > 0:
+                    self._ranks.add(total_points)
+            entry = self._entries.get(user_id)
+            if entry is None:
+                # Entering the board needs the user's profile — reload instead
+                if len(self._keys) < self.size or (-total_points, user_id) < self._keys[-1]:
+                    self._loaded_at = None
+                    changed = True
+                continue
+            del self._keys[bisect_left(self._keys, (-entry["total_points"], user_id))]
+            entry["total_points"], entry["games_played"] = total_points, games_played
+            insort(self._keys, (-total_points, user_id))
+            changed = True
+        return changed
+
+    async def top(self, db: AsyncSession, limit: int) -> list[dict]:
+        if self._loaded_at is None or time.monotonic() - self._loaded_at > self.refresh_seconds:
+            await self._load(db)
+        return [dict(self._entries[user_id]) for _, user_id in self._keys[:limit]]
+
+    async def rank(self, db: AsyncSession, user_id: int) -> dict | None:
+        """The user's entry plus rank, or None if they have no games in this bucket."""
+        source = self._source()
+        row = (await db.execute(self._entry_query(source).where(source.c.user_id == user_id))).first()
+        if row is None:
+            return None
+        ranks = await self._rank_tree(db)
+        return {**_entry(row), "rank": ranks.above(row.total_points) + 1, "total_users": ranks.total}
+
+    async def around(self, db: AsyncSession, user_id: int, window: int) -> list[dict] | None:
+        """Up to `window` users either side of the user, in leaderboard order, each with its rank."""
+        me = await self.rank(db, user_id)
+        if me is None:
+            return None
+        source = self._source()
+        points, uid = source.c.total_points, source.c.user_id
+        mine = me["total_points"]
+
+        # Ahead: same points and a lower id, then more points — read nearest first off the index
+        ahead = await self._scan(db, self._entry_query(source)
+                                 .where(points == mine, uid < user_id).order_by(uid.desc()), window)
+        if len(ahead) < window:
+            ahead += await self._scan(db, self._entry_query(source)
+                                      .where(points > mine).order_by(points, uid.desc()), window - len(ahead))
+        behind = await self._scan(db, self._entry_query(source)
+                                  .where(points == mine, uid > user_id).order_by(uid), window)
+        if len(behind) < window:
+            behind += await self._scan(db, self._entry_query(source)
+                                       .where(points < mine).order_by(points.desc(), uid), window - len(behind))
+
+        ranks = await self._rank_tree(db)
+        page = ahead[::-1] + [me] + behind
+        for entry in page:
+            entry["rank"] = ranks.above(entry["total_points"]) + 1
+        return page
+
+    def _source(self):
+        if self.period == ALL and self.language == ALL:
+            return select(UserTotal.user_id, UserTotal.total_points, UserTotal.games_played).subquery()
+        return (
+            select(ScoreRollup.user_id, ScoreRollup.points.label("total_points"), ScoreRollup.games_played)
+            .where(ScoreRollup.period == self.period, ScoreRollup.language == self.language)
+            .subquery()
+        )
+
+    @staticmethod
+    def _entry_query(source):
+        return (
+            select(User.id, User.username, User.first_name, User.last_name, User.avatar_url,
+                   source.c.total_points, source.c.games_played)
+            .join(source, source.c.user_id == User.id)
+            .where(source.c.games_played > 0)
+        )
+
+    @staticmethod
+    async def _scan(db: AsyncSession, query, limit: int) -> list[dict]:
+        return [_entry(r) for r in await db.execute(query.limit(limit))]
+
+    async def _rank_tree(self, db: AsyncSession) -> FenwickTree:
+        if self._ranks is None or time.monotonic() - self._ranks_loaded_at > self.rank_refresh_seconds:
+            source = self._source()
+            result = await db.execute(
+                select(source.c.total_points, func.count())
+                .where(source.c.games_played > 0)
+                .group_by(source.c.total_points)
+            )
+            self._ranks = FenwickTree(dict(result.all()))
+            self._ranks_loaded_at = time.monotonic()
+        return self._ranks
+
+    async def _load(self, db: AsyncSession):
+        source = self._source()
+        result = await db.execute(
+            self._entry_query(source).order_by(source.c.total_points.desc(), source.c.user_id).limit(self.size)
+        )
+        self._entries = {r.id: _entry(r) for r in result}
+        self._keys = sorted((-e["total_points"], user_id) for user_id, e in self._entries.items())
+        self._loaded_at = time.monotonic()
+
+
+def _entry(r) -> dict:
+    return {"user_id": r.id, "username": r.username, "first_name": r.first_name, "last_name": r.last_name,
+            "avatar_url": r.avatar_url, "total_points": r.total_points, "games_played": r.games_played}
+
+
+board = Leaderboard()
+_boards: OrderedDict[tuple[str, str], Leaderboard] = OrderedDict()
+
+
+def board_for(period: str = ALL, language: str | None = None) -> Leaderboard:
+    """The board for the current day/week/all-time, optionally one language.
+
+    At most MAX_BOARDS are kept, least recently read dropped first, so arbitrary
+    language values can't grow memory without bound.
+    """
+    key = (period_key(period), (language or ALL).lower())
+    if key == (ALL, ALL):
+        return board
+    if key in _boards:
+        _boards.move_to_end(key)
+        return _boards[key]
+    # Drop boards of days/weeks that have rolled over
+    current = {period_key(p) for p in PERIODS}
+    for stale in [k for k in _boards if k[0] not in current]:
+        del _boards[stale]
+    while len(_boards) >= MAX_BOARDS:
+        _boards.popitem(last=False)
+    _boards[key] = Leaderboard(*key)
+    return _boards[key]
+
+
+def invalidate():
+    board.invalidate()
+    for b in _boards.values():
+        b.invalidate()
+    response_cache.invalidate("leaderboard")
+    response_cache.invalidate("leaderboard_rank")
@@ -0,0 +1,21 @@
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.models import SongLyrics
+
+# Line numbers are 0-based; Postgres arrays are 1-based, so line n is lines[n + 1] in SQL.
+
+
+async def all_lines(db: AsyncSession, song_id: int) -> list[str]:
+    result = await db.execute(select(SongLyrics.lines).where(SongLyrics.song_id == song_id))
+    return result.scalar() or []
+
+
+async def line_range(db: AsyncSession, song_id: int, first: int, last: int) -> dict[int, str]:
+    """Lines first..last (inclusive) by line number, sliced server-side; lines past the end are absent."""
+    first = max(first, 0)
+    if last < first:
+        return {}
+    result = await db.execute(
+        select(SongLyrics.lines[first + 1:last + 1]).where(SongLyrics.song_id == song_id)
+    )
+    return {first + i: text for i, text in enumerate(result.scalar() or [])}
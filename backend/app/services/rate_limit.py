@@ -0,0 +1,42 @@
+import asyncio
+import os
+import time
+
+# Requests per second allowed to each upstream, and how many may go out back to back
+YTMUSIC_RATE = float(os.getenv("YTMUSIC_RATE", "2"))
+YTMUSIC_BURST = int(os.getenv("YTMUSIC_BURST", "4"))
+GENIUS_RATE = float(os.getenv("GENIUS_RATE", "1"))
+GENIUS_BURST = int(os.getenv("GENIUS_BURST", "2"))
+
+
+class TokenBucket:
+    """Async token bucket — `rate` acquisitions per second on average, up to `burst` at once.
+
+    Waiters queue on a lock, so they are served in arrival order.
+    """
+
+    def __init__(self, rate: float, burst: int = 1):
+        self.rate = rate
+        self.burst = burst
+        self._tokens = float(burst)
+        self._updated = time.monotonic()
+        self._lock = asyncio.Lock()
+        self.acquired = 0
+        self.waited = 0.0
+
+    async def acquire(self):
+        async with self._lock:
+            now = time.monotonic()
+            self._tokens = min(self.burst, self._tokens + (now - self._updated) * self.rate)
+            self._updated = now
+            if self._tokens < 1:
+                wait = (1 - self._tokens) / self.rate
+                await asyncio.sleep(wait)
+                self.waited += wait
+                self._tokens, self._updated = 1.0, time.monotonic()
+            self._tokens -= 1
+            self.acquired += 1
+
+
+ytmusic = TokenBucket(YTMUSIC_RATE, YTMUSIC_BURST)
+genius = TokenBucket(GENIUS_RATE, GENIUS_BURST)
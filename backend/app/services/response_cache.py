@@ -0,0 +1,91 @@
+import asyncio
+import os
+import time
+from collections import OrderedDict
+
+MAX_ENTRIES = int(os.getenv("RESPONSE_CACHE_SIZE", "2048"))
+
+# Seconds a response stays fresh, per route; override with e.g. RESPONSE_CACHE_TTLS="leaderboard=10,languages=600"
+TTLS = {"languages": 300, "leaderboard": 5, "leaderboard_rank": 5}
+for _item in filter(None, os.getenv("RESPONSE_CACHE_TTLS", "").split(",")):
+    _route, _, _ttl = _item.partition("=")
+    TTLS[_route.strip()] = float(_ttl)
+
+
+class ResponseCache:
+    """Bounded TTL cache for route results, keyed by (route, *params).
+
+    Concurrent misses on one key are coalesced: the first request computes, the rest
+    await its result. Invalidating a route (or a key prefix) drops cached entries and
+    keeps computations already in flight from storing their now-stale result.
+    """
+
+    def __init__(self, max_entries: int = MAX_ENTRIES, ttls: dict[str, float] = TTLS):
+        self.max_entries = max_entries
+        self.ttls = ttls
+        self._entries: OrderedDict[tuple, tuple[float, object]] = OrderedDict()  # key → (expires, value)
+        self._inflight: dict[tuple, asyncio.Future] = {}
+        self._generations: dict[str, int] = {}
+        self.stats = {route: {"hits": 0, "misses": 0, "coalesced": 0} for route in ttls}
+
+    async def get(self, route: str, params: tuple, compute):
+        """Cached result of `await compute()` for this route and params."""
+        key = (route, *params)
+        stats = self.stats.setdefault(route, {"hits": 0, "misses": 0, "coalesced": 0})
+        entry = self._entries.get(key)
+        if entry and entry[0] > time.monotonic():
+            self._entries.move_to_end(key)
+            stats["hits"] += 1
+            return entry[1]
+
+        fut = self._inflight.get(key)
+        if fut is not None:
+            stats["coalesced"] += 1
+            try:
+                return await asyncio.shield(fut)
+            except asyncio.CancelledError:
+                if not fut.cancelled():
+                    raise
+                # The request computing it went away — compute for ourselves
+                return await compute()
+
+        stats["misses"] += 1
+        generation = self._generations.get(route, 0)
+        fut = self._inflight[key] = asyncio.get_running_loop().create_future()
+        try:
+            value = await compute()
+        except BaseException as e:
+            if isinstance(e, asyncio.CancelledError):
+                fut.cancel()
+            else:
+                fut.set_exception(e)
+                fut.exception()  # don't warn when nobody was waiting
+            raise
+        finally:
+            del self._inflight[key]
+        fut.set_result(value)
+        if self._generations.get(route, 0) == generation:
+            self._put(key, value, self.ttls.get(route, 0))
+        return value
+
+    def _put(self, key: tuple, value, ttl: float):
+        if ttl <= 0:
+            return
+        self._entries[key] = (time.monotonic() + ttl, value)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def invalidate(self, route: str, *params):
+        """Drop a route's entries, or only those whose params start with `params`."""
+        prefix = (route, *params)
+        for key in [k for k in self._entries if k[:len(prefix)] == prefix]:
+            del self._entries[key]
+        self._generations[route] = self._generations.get(route, 0) + 1
+
+    def metrics(self) -> dict:
+        return {"entries": len(self._entries), "max_entries": self.max_entries, "inflight": len(self._inflight),
+                "routes": {route: {**counts, "ttl": self.ttls.get(route, 0)} for route, counts in self.stats.items()}}
+
+
+cache = ResponseCache()
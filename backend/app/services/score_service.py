@@ -0,0 +1,235 @@
+import asyncio
+import json
+import logging
+import os
+from datetime import datetime, timezone
+from sqlalchemy import case
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.models import Score
+from app.services.leaderboard_service import board, with_totals
+from app.services.response_cache import cache as response_cache
+
+logger = logging.getLogger(__name__)
+
+WRITE_BEHIND = os.getenv("SCORE_WRITE_BEHIND", "").lower() in ("1", "true", "yes")
+FLUSH_MS = int(os.getenv("SCORE_FLUSH_MS", "200"))
+FLUSH_EVENTS = int(os.getenv("SCORE_FLUSH_EVENTS", "500"))
+SPOOL_PATH = os.getenv("SCORE_SPOOL_PATH", "scores.spool.jsonl")
+# Attempts per write-behind batch before it is spooled to SPOOL_PATH; waits double from 0.5 s
+FLUSH_ATTEMPTS = int(os.getenv("SCORE_FLUSH_ATTEMPTS", "4"))
+
+GUESS, HINT, REVEAL = "guess", "hint", "reveal"
+POINTS, HINT_POINTS = 10, 5
+
+
+def score_upsert(rows: list[tuple[int, int]], event: str):
+    """One multi-row INSERT ... ON CONFLICT per event against the unique (user_id, challenge_id) row.
+
+    guess  — marks correct; points: 0 if already revealed, 5 if a hint was used, else 10; sets scored_at
+    hint   — only recorded before anything else happened on the challenge
+    reveal — marks revealed unless the song was already guessed
+    """
+    now = datetime.now(timezone.utc)
+    stmt = insert(Score).values([
+        dict(
+            user_id=user_id, challenge_id=challenge_id,
+            guessed_correct=event == GUESS, used_hint=event == HINT, revealed=event == REVEAL,
+            points=POINTS if event == GUESS else 0, created_at=now, scored_at=now,
+        )
+        for user_id, challenge_id in rows
+    ])
+    keys = [Score.user_id, Score.challenge_id]
+    if event == GUESS:
+        # The guess is when the points are earned, so the game moves to its day/week
+        return stmt.on_conflict_do_update(
+            index_elements=keys,
+            set_={"guessed_correct": True, "points": case((Score.revealed, 0), (Score.used_hint, HINT_POINTS), else_=POINTS),
+                  "scored_at": stmt.excluded.scored_at},
+            where=Score.guessed_correct == False,
+        )
+    if event == REVEAL:
+        return stmt.on_conflict_do_update(
+            index_elements=keys, set_={"revealed": True},
+            where=(Score.guessed_correct == False) & (Score.revealed == False),
+        )
+    return stmt.on_conflict_do_nothing(index_elements=keys)
+
+
+async def record(db: AsyncSession, user_id: int, challenge_id: int, event: str):
+    """Record a score event — queued when write-behind is on, spooled on database-less nodes, otherwise written now."""
+    if buffer.running and buffer.submit(user_id, challenge_id, event):
+        return
+    if spool.running:
+        spool.submit(user_id, challenge_id, event)
+        return
+    await record_now(db, user_id, challenge_id, event)
+
+
+async def record_now(db: AsyncSession, user_id: int, challenge_id: int, event: str):
+    try:
+        totals = (await db.execute(with_totals(score_upsert([(user_id, challenge_id)], event)))).all()
+        await db.commit()
+        _applied(totals)
+    except IntegrityError:
+        # Unknown user (or challenge deleted meanwhile) — nothing to score
+        await db.rollback()
+        logger.info(f"Score {event} ignored for user {user_id}, challenge {challenge_id}")
+
+
+def _applied(totals):
+    """Push committed totals to the in-memory leaderboard and drop cached pages they change."""
+    if board.apply(totals):
+        response_cache.invalidate("leaderboard")
+    for user_id, *_ in totals:
+        response_cache.invalidate("leaderboard_rank", user_id)
+
+
+def _runs(events: list[tuple[int, int, str]]):
+    """Split into runs with distinct (user, challenge) keys — one upsert can't touch a row twice."""
+    run, keys = [], set()
+    for ev in events:
+        if ev[:2] in keys:
+            yield run
+            run, keys = [], set()
+        run.append(ev)
+        keys.add(ev[:2])
+    if run:
+        yield run
+
+
+async def write_batch(db: AsyncSession, events: list[tuple[int, int, str]]):
+    # A repeat of the same event on the same row is always a no-op, so drop it up front
+    events = list(dict.fromkeys(events))
+    totals = []
+    try:
+        for run in _runs(events):
+            by_event: dict[str, list[tuple[int, int]]] = {}
+            for user_id, challenge_id, event in run:
+                by_event.setdefault(event, []).append((user_id, challenge_id))
+            for event, rows in by_event.items():
+                totals += (await db.execute(with_totals(score_upsert(rows, event)))).all()
+        await db.commit()
+        _applied(totals)
+    except IntegrityError:
+        # Someone in the batch doesn't exist any more — replay one by one, skipping failures
+        await db.rollback()
+        for user_id, challenge_id, event in events:
+            await record_now(db, user_id, challenge_id, event)
+
+
+class ScoreBuffer:
+    """Opt-in write-behind: score events go on a queue and are flushed in batches by one task.
+
+    A batch that fails is retried with backoff (the upserts are idempotent); if it still
+    fails it's appended to the score spool, to be replayed with `python -m app.snapshot replay`.
+    """
+
+    def __init__(self, flush_ms: int = FLUSH_MS, flush_events: int = FLUSH_EVENTS, attempts: int = FLUSH_ATTEMPTS):
+        self.flush_ms = flush_ms
+        self.flush_events = flush_events
+        self.attempts = attempts
+        self._queue: asyncio.Queue | None = None
+        self._task: asyncio.Task | None = None
+        self._db_factory = None
+
+    @property
+    def running(self) -> bool:
+        return self._task is not None and not self._task.done()
+
+    def start(self, db_factory):
+        self._db_factory = db_factory
+        self._queue = asyncio.Queue(maxsize=self.flush_events * 20)
+        self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        """Flush everything still buffered and stop the task."""
+        if not self.running:
+            return
+        task, self._task = self._task, None  # later events are written directly
+        await self._queue.put(None)
+        await task
+
+    def submit(self, user_id: int, challenge_id: int, event: str) -> bool:
+        """Queue an event; False when the buffer is full and the caller should write directly."""
+        try:
+            self._queue.put_nowait((user_id, challenge_id, event))
+            return True
+        except asyncio.QueueFull:
+            return False
+
+    async def _run(self):
+        loop = asyncio.get_running_loop()
+        stopping = False
+        while not stopping:
+            item = await self._queue.get()
+            if item is None:
+                break
+            batch = [item]
+            deadline = loop.time() + self.flush_ms / 1000
+            while len(batch) < self.flush_events:
+                timeout = deadline - loop.time()
+                if timeout <= 0:
+                    break
+                try:
+                    item = await asyncio.wait_for(self._queue.get(), timeout)
+                except asyncio.TimeoutError:
+                    break
+                if item is None:
+                    stopping = True
+                    break
+                batch.append(item)
+            await self._flush(batch)
+
+    async def _flush(self, batch: list[tuple[int, int, str]]):
+        for attempt in range(self.attempts):
+            if attempt:
+                await asyncio.sleep(0.5 * 2 ** (attempt - 1))
+            try:
+                async with self._db_factory() as db:
+                    await write_batch(db, batch)
+                return
+            except Exception as e:
+                logger.warning(f"Score flush failed (attempt {attempt + 1}/{self.attempts}): {e}")
+        spool.append(batch)
+        logger.error(f"Score flush gave up, {len(batch)} events spooled to {spool.path} for replay")
+
+
+class ScoreSpool:
+    """Append-only JSON-lines file of score events, for snapshot nodes with no database.
+
+    Replay it later with `python -m app.snapshot replay <path>`.
+    """
+
+    def __init__(self, path: str = SPOOL_PATH):
+        self.path = path
+        self._file = None
+
+    @property
+    def running(self) -> bool:
+        return self._file is not None
+
+    def open(self):
+        self._file = open(self.path, "a", buffering=1)
+
+    def close(self):
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+    def submit(self, user_id: int, challenge_id: int, event: str):
+        self._file.write(json.dumps([user_id, challenge_id, event]) + "\n")
+
+    def append(self, events: list[tuple[int, int, str]]):
+        """Add events whether or not the spool is open — failed write-behind batches land here."""
+        if self.running:
+            for ev in events:
+                self.submit(*ev)
+            return
+        with open(self.path, "a") as f:
+            f.writelines(json.dumps(list(ev)) + "\n" for ev in events)
+
+
+buffer = ScoreBuffer()
+spool = ScoreSpool()
@@ -0,0 +1,135 @@
+import os
+import time
+from collections import OrderedDict
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.models import Score
+from app.snapshot import snapshot
+
+MAX_USERS = int(os.getenv("SEEN_TRACKER_MAX_USERS", "5000"))
+# A user's set is re-read from scores after this long, picking up plays served by other workers
+TTL_SECONDS = float(os.getenv("SEEN_TRACKER_TTL_SECONDS", "60"))
+
+
+class SeenBitmap:
+    """Growable bitmap over challenge ids — one bit per id."""
+
+    __slots__ = ("bits",)
+
+    def __init__(self):
+        self.bits = bytearray()
+
+    def add(self, challenge_id: int):
+        byte = challenge_id >> 3
+        if byte >= len(self.bits):
+            self.bits.extend(bytes(byte - len(self.bits) + 1))
+        self.bits[byte] |= 1 << (challenge_id & 7)
+
+    def discard(self, challenge_id: int):
+        byte = challenge_id >> 3
+        if byte < len(self.bits):
+            self.bits[byte] &= ~(1 << (challenge_id & 7)) & 0xFF
+
+    def update(self, other: "SeenBitmap"):
+        if len(other.bits) > len(self.bits):
+            self.bits.extend(bytes(len(other.bits) - len(self.bits)))
+        for i, byte in enumerate(other.bits):
+            self.bits[i] |= byte
+
+    def __contains__(self, challenge_id: int) -> bool:
+        byte = challenge_id >> 3
+        return byte < len(self.bits) and bool(self.bits[byte] & (1 << (challenge_id & 7)))
+
+    def __bool__(self) -> bool:
+        return bool(self.bits)
+
+    def clear(self):
+        self.bits = bytearray()
+
+
+class SeenUnion:
+    """Read-only view over several seen-sets: an id is seen if any of them has it."""
+
+    __slots__ = ("sets",)
+
+    def __init__(self, *sets):
+        self.sets = sets
+
+    def __contains__(self, challenge_id: int) -> bool:
+        return any(challenge_id in s for s in self.sets)
+
+    def __bool__(self) -> bool:
+        return any(self.sets)
+
+
+class _UserSeen:
+    __slots__ = ("seen", "cleared", "expires")
+
+    def __init__(self, seen: SeenBitmap, cleared: SeenBitmap, expires: float):
+        self.seen = seen
+        self.cleared = cleared  # played, but forgotten by a reset — not re-added from scores
+        self.expires = expires
+
+
+class SeenTracker:
+    """Per-user seen-sets kept in process, seeded from `scores` (except in snapshot mode) and LRU-evicted.
+
+    Sets are re-seeded after ttl seconds, so plays handled by other workers show up.
+    Snapshot nodes have no scores to re-read, so their sets only change locally.
+    """
+
+    def __init__(self, max_users: int = MAX_USERS, ttl: float = TTL_SECONDS):
+        self.max_users = max_users
+        self.ttl = ttl
+        self._users: OrderedDict[int, _UserSeen] = OrderedDict()
+
+    async def get(self, user_id: int, db: AsyncSession) -> SeenBitmap:
+        return (await self._state(user_id, db)).seen
+
+    async def _state(self, user_id: int, db: AsyncSession) -> _UserSeen:
+        state = self._users.get(user_id)
+        if state is not None and (snapshot is not None or time.monotonic() < state.expires):
+            self._users.move_to_end(user_id)
+            return state
+
+        cleared = state.cleared if state is not None else SeenBitmap()
+        seen = SeenBitmap()
+        if snapshot is None:
+            result = await db.execute(select(Score.challenge_id).where(Score.user_id == user_id))
+            for (challenge_id,) in result:
+                if challenge_id not in cleared:
+                    seen.add(challenge_id)
+        current = self._users.get(user_id)
+        if current is not state and current is not None:
+            # Another request (re)loaded this user while we were waiting on the DB
+            self._users.move_to_end(user_id)
+            return current
+        state = self._users[user_id] = _UserSeen(seen, cleared, time.monotonic() + self.ttl)
+        self._users.move_to_end(user_id)
+        while len(self._users) > self.max_users:
+            self._users.popitem(last=False)
+        return state
+
+    def mark(self, user_id: int, challenge_id: int):
+        state = self._users.get(user_id)
+        if state is not None:
+            state.seen.add(challenge_id)
+            state.cleared.discard(challenge_id)
+
+    async def reset(self, user_id: int, db: AsyncSession, challenge_ids: list[int] | None = None):
+        """Start the user's next cycle through `challenge_ids` (one language's), or through everything.
+
+        The ids are forgotten rather than the user's whole entry, which would reseed it from scores.
+        """
+        state = await self._state(user_id, db)
+        if challenge_ids is None:
+            state.cleared.update(state.seen)
+            state.seen.clear()
+            return
+        for challenge_id in challenge_ids:
+            if challenge_id in state.seen:
+                state.seen.discard(challenge_id)
+                state.cleared.add(challenge_id)
+
+
+tracker = SeenTracker()
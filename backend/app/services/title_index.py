@@ -0,0 +1,198 @@
+import asyncio
+import os
+import re
+from collections import Counter
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.db import async_session
+from app.models import Song, SongTitleVariant
+from app.services.title_matcher import guess_forms, normalize_text, phonetic_key, ratio, title_profile, transliterate
+from app.snapshot import snapshot
+
+# Trigram postings counted per nearest() lookup, rarest trigrams first
+MAX_POSTINGS = int(os.getenv("TITLE_INDEX_MAX_POSTINGS", "3000"))
+
+# --- Variant generation ---
+
+_PARENS = re.compile(r"\s*(\([^()]*\)|\[[^\[\]]*\])")  # innermost (...) / [...]
+_FEAT = re.compile(r"\s+(feat\.?|ft\.?|featuring)\s.*$", re.IGNORECASE)
+_DASH_SUFFIX = re.compile(r"\s+[-–—|]\s+.*$")  # "Hukum - Telugu", "Title | From X"
+
+
+def title_variants(title: str) -> list[str]:
+    """Normalized forms a player might type for a title, decorations stripped."""
+    forms = {title}
+    base = title
+    while (stripped := _PARENS.sub("", base)) != base:
+        base = stripped
+    forms.add(base)
+    base = _FEAT.sub("", base)
+    forms.add(base)
+    forms.add(_DASH_SUFFIX.sub("", base))
+
+    variants = set()
+    for form in forms:
+        for text in (form, transliterate(form)):
+            norm = normalize_text(text)
+            if norm:
+                variants.add(norm)
+                variants.add(phonetic_key(norm))
+    return sorted(variants)
+
+
+def _trigrams(text: str) -> set[str]:
+    padded = f"  {text} "
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+# --- In-memory index ---
+
+class TitleIndex:
+    """Title variants per song plus a trigram index over all of them for nearest-neighbour lookups.
+
+    Each (song_id, variant) is an integer entry id, and the trigram postings are sets
+    of those ids. Loaded at startup; if that failed, the first lookup loads it.
+    """
+
+    def __init__(self, max_postings: int = MAX_POSTINGS):
+        self.max_postings = max_postings
+        self._variants: dict[int, tuple[str, ...]] = {}
+        self._entries: list[tuple[int, str] | None] = []  # entry id → (song_id, variant); None once removed
+        self._song_entries: dict[int, list[int]] = {}
+        self._grams: dict[str, set[int]] = {}
+        self._loaded = False
+        self._lock = asyncio.Lock()
+        self._pending: list[tuple[int, list[str] | None]] | None = None  # add/remove calls made during a rebuild
+
+    def __contains__(self, song_id: int) -> bool:
+        return song_id in self._variants
+
+    async def _ensure_loaded(self):
+        if self._loaded:
+            return
+        async with self._lock:
+            if self._loaded:
+                return
+            if snapshot is not None:
+                await self.load_rows(snapshot.variants())
+            else:
+                async with async_session() as db:
+                    await self.load(db)
+
+    async def variants(self, song_id: int | None) -> tuple[str, ...]:
+        await self._ensure_loaded()
+        return self._variants.get(song_id, ()) if song_id is not None else ()
+
+    def add(self, song_id: int, variants: list[str]):
+        self.remove(song_id)
+        if self._pending is not None:
+            self._pending.append((song_id, variants))
+        self._variants[song_id] = tuple(variants)
+        ids = self._song_entries[song_id] = []
+        for v in variants:
+            entry = len(self._entries)
+            self._entries.append((song_id, v))
+            ids.append(entry)
+            for g in _trigrams(v):
+                self._grams.setdefault(g, set()).add(entry)
+
+    def remove(self, song_id: int):
+        if self._pending is not None:
+            self._pending.append((song_id, None))
+        self._variants.pop(song_id, None)
+        for entry in self._song_entries.pop(song_id, ()):
+            _, v = self._entries[entry]
+            self._entries[entry] = None
+            for g in _trigrams(v):
+                postings = self._grams.get(g)
+                if postings:
+                    postings.discard(entry)
+                    if not postings:
+                        del self._grams[g]
+
+    async def nearest(self, guess: str, candidates: int = 100) -> tuple[int, str, float] | None:
+        """Best (song_id, variant, score) for a guess.
+
+        Candidates are the entries sharing the most trigrams with the guess, counted
+        rarest trigram first and stopping once max_postings entries have been counted:
+        common trigrams ("  t", "an ") match much of the catalogue and barely move the
+        ranking. Candidates whose length alone rules out beating the best so far aren't
+        scored, and an exact match ends the search.
+        """
+        await self._ensure_loaded()
+        forms = guess_forms(guess)
+        grams = set().union(*(_trigrams(f) for f in forms))
+        overlap: Counter[int] = Counter()
+        counted = 0
+        for postings in sorted((p for g in grams if (p := self._grams.get(g))), key=len):
+            if counted and counted + len(postings) > self.max_postings:
+                break
+            overlap.update(postings)
+            counted += len(postings)
+        best = None
+        for entry, _ in overlap.most_common(candidates):
+            song_id, variant = self._entries[entry]
+            if best is not None and max(2 * min(len(f), len(variant)) / (len(f) + len(variant))
+                                        for f in forms) <= best[2]:
+                continue
+            _, masks = title_profile(variant)
+            s = max(ratio(f, variant, masks) for f in forms)
+            if best is None or s > best[2]:
+                best = (song_id, variant, s)
+                if s >= 1.0:
+                    break
+        return best
+
+    async def _replace(self, stored: dict[int, list[str]]):
+        """Build a new index on a worker thread (seconds, for a full catalogue) and swap it in.
+
+        add/remove calls made meanwhile are replayed onto the new index before the swap.
+        """
+        self._pending = []
+        try:
+            fresh = await asyncio.to_thread(_build, stored, self.max_postings)
+            for song_id, variants in self._pending:
+                if variants is None:
+                    fresh.remove(song_id)
+                else:
+                    fresh.add(song_id, variants)
+        finally:
+            self._pending = None
+        self._variants, self._entries, self._song_entries, self._grams = \
+            fresh._variants, fresh._entries, fresh._song_entries, fresh._grams
+        self._loaded = True
+
+    async def load_rows(self, rows):
+        """Load (song_id, variant) rows as they are, e.g. from a snapshot."""
+        stored: dict[int, list[str]] = {}
+        for song_id, variant in rows:
+            stored.setdefault(song_id, []).append(variant)
+        await self._replace(stored)
+
+    async def load(self, db: AsyncSession):
+        """Load stored variants; songs imported before variants existed are backfilled."""
+        result = await db.execute(select(SongTitleVariant.song_id, SongTitleVariant.variant))
+        stored: dict[int, list[str]] = {}
+        for song_id, variant in result:
+            stored.setdefault(song_id, []).append(variant)
+
+        songs = await db.execute(select(Song.id, Song.title))
+        missing = False
+        for song_id, title in songs:
+            if song_id not in stored:
+                stored[song_id] = title_variants(title)
+                db.add_all(SongTitleVariant(song_id=song_id, variant=v) for v in stored[song_id])
+                missing = True
+        await self._replace(stored)
+        if missing:
+            await db.commit()
+
+
+def _build(stored: dict[int, list[str]], max_postings: int) -> TitleIndex:
+    built = TitleIndex(max_postings)
+    for song_id, variants in stored.items():
+        built.add(song_id, variants)
+    return built
+
+
+index = TitleIndex()
@@ -0,0 +1,164 @@
+import os
+import re
+import unicodedata
+from collections import OrderedDict
+from functools import lru_cache
+
+LOW, HIGH = 0.6, 0.9  # near-match / correct thresholds
+RESULT_CACHE_SIZE = int(os.getenv("GUESS_CACHE_SIZE", "4096"))
+
+_PUNCT = re.compile(r"[^\w\s]")
+_SPACE = re.compile(r"\s+")
+
+
+def normalize_text(text: str) -> str:
+    text = unicodedata.normalize("NFKD", text).lower()
+    return _SPACE.sub(" ", _PUNCT.sub("", text)).strip()
+
+
+# Devanagari (U+0900) and Telugu (U+0C00) share the ISCII layout, so one table keyed by
+# offset within the block romanizes both.
+_INDIC_BLOCKS = (0x0900, 0x0C00)
+_INDIC_VOWELS = {0x05: "a", 0x06: "aa", 0x07: "i", 0x08: "ii", 0x09: "u", 0x0A: "uu", 0x0B: "ri",
+                 0x0E: "e", 0x0F: "e", 0x10: "ai", 0x12: "o", 0x13: "o", 0x14: "au"}
+_INDIC_CONSONANTS = {0x15: "k", 0x16: "kh", 0x17: "g", 0x18: "gh", 0x19: "ng", 0x1A: "ch", 0x1B: "chh",
+                     0x1C: "j", 0x1D: "jh", 0x1E: "ny", 0x1F: "t", 0x20: "th", 0x21: "d", 0x22: "dh",
+                     0x23: "n", 0x24: "t", 0x25: "th", 0x26: "d", 0x27: "dh", 0x28: "n", 0x2A: "p",
+                     0x2B: "ph", 0x2C: "b", 0x2D: "bh", 0x2E: "m", 0x2F: "y", 0x30: "r", 0x31: "r",
+                     0x32: "l", 0x33: "l", 0x35: "v", 0x36: "sh", 0x37: "sh", 0x38: "s", 0x39: "h"}
+_INDIC_SIGNS = {0x3E: "aa", 0x3F: "i", 0x40: "ii", 0x41: "u", 0x42: "uu", 0x43: "ri",
+                0x46: "e", 0x47: "e", 0x48: "ai", 0x4A: "o", 0x4B: "o", 0x4C: "au"}
+_INDIC_MARKS = {0x01: "n", 0x02: "n", 0x03: "h"}
+_VIRAMA, _NUKTA = 0x4D, 0x3C
+
+
+def _indic_offset(ch: str) -> int | None:
+    cp = ord(ch)
+    for base in _INDIC_BLOCKS:
+        if base <= cp < base + 0x80:
+            return cp - base
+    return None
+
+
+def transliterate(text: str) -> str:
+    """Rough romanization of Devanagari/Telugu text; other characters pass through."""
+    out = []
+    pending_a = False  # inherent vowel of the last consonant, dropped by a sign or virama
+    for ch in text:
+        off = _indic_offset(ch)
+        if off is None:
+            if pending_a:
+                out.append("a")
+            pending_a = False
+            out.append(ch)
+        elif off in _INDIC_CONSONANTS:
+            if pending_a:
+                out.append("a")
+            out.append(_INDIC_CONSONANTS[off])
+            pending_a = True
+        elif off in _INDIC_SIGNS:
+            out.append(_INDIC_SIGNS[off])
+            pending_a = False
+        elif off == _VIRAMA:
+            pending_a = False
+        elif off == _NUKTA:
+            continue
+        else:
+            if pending_a:
+                out.append("a")
+            pending_a = False
+            out.append(_INDIC_VOWELS.get(off) or _INDIC_MARKS.get(off, ""))
+    if pending_a:
+        out.append("a")
+    return "".join(out)
+
+
+_PHONETIC = [(re.compile(p), r) for p, r in [
+    (r"([aeiou])\1+", r"\1"), (r"ee|ii", "i"), (r"oo|uu", "u"),
+    (r"([kgcjtdpb])h", r"\1"), (r"sh", "s"), (r"ph", "f"), (r"w", "v"), (r"z", "j"), (r"q", "k"),
+    (r"([^aeiou\s])\1+", r"\1"), (r"y\b", "i"),
+]]
+
+
+def phonetic_key(norm: str) -> str:
+    """Collapse common romanization differences (aa/a, th/t, vv/v, y/i...)."""
+    for pattern, repl in _PHONETIC:
+        norm = pattern.sub(repl, norm)
+    return norm
+
+
+def guess_forms(guess: str) -> tuple[str, ...]:
+    norm = normalize_text(transliterate(guess))
+    return (norm, phonetic_key(norm))
+
+
+@lru_cache(maxsize=8192)
+def title_profile(title: str) -> tuple[str, dict[str, int]]:
+    """Normalized title plus per-character bitmasks of its positions, computed once per title."""
+    norm = normalize_text(title)
+    masks: dict[str, int] = {}
+    for i, ch in enumerate(norm):
+        masks[ch] = masks.get(ch, 0) | (1 << i)
+    return norm, masks
+
+
+def _lcs_length(masks: dict[str, int], m: int, text: str) -> int:
+    """Bit-parallel LCS (Hyyrö): one big-int pass per character of `text`."""
+    full = (1 << m) - 1
+    v = full
+    for ch in text:
+        u = v & masks.get(ch, 0)
+        v = ((v + u) | (v - u)) & full
+    return m - v.bit_count()
+
+
+def ratio(guess: str, title: str, masks: dict[str, int]) -> float:
+    """2·LCS / total length — the measure SequenceMatcher.ratio() approximates.
+
+    Both strings are already normalized. When the lengths alone rule out a near
+    match, the (sub-threshold) upper bound is returned without scanning.
+    """
+    total = len(guess) + len(title)
+    if not total or guess == title:
+        return 1.0
+    bound = 2 * min(len(guess), len(title)) / total
+    if bound < LOW:
+        return bound
+    return 2 * _lcs_length(masks, len(title), guess) / total
+
+
+def similarity(guess: str, title: str) -> float:
+    norm_title, masks = title_profile(title)
+    return ratio(normalize_text(guess), norm_title, masks)
+
+
+def best_ratio(forms: tuple[str, ...], targets: tuple[str, ...]) -> float:
+    """Highest ratio between any guess form and any target, stopping once a target clears HIGH."""
+    best = 0.0
+    for target in targets:
+        norm, masks = title_profile(target)
+        for form in forms:
+            best = max(best, ratio(form, norm, masks))
+            if best >= HIGH:
+                return best
+    return best
+
+
+_results: OrderedDict[tuple[int, str], float] = OrderedDict()
+
+
+def score(guess: str, title: str, key: int | None = None, variants: tuple[str, ...] = ()) -> float:
+    """Best similarity against the title and its variants, memoized per (key, normalized guess)."""
+    forms = guess_forms(guess) if variants else (normalize_text(guess),)
+    targets = (title,) + variants
+    if key is None:
+        return best_ratio(forms, targets)
+    cache_key = (key, forms[0])
+    s = _results.get(cache_key)
+    if s is not None:
+        _results.move_to_end(cache_key)
+        return s
+    s = _results[cache_key] = best_ratio(forms, targets)
+    if len(_results) > RESULT_CACHE_SIZE:
+        _results.popitem(last=False)
+    return s
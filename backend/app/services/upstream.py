@@ -0,0 +1,86 @@
+import asyncio
+import os
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+import requests
+from ytmusicapi import YTMusic
+from app.services import rate_limit
+from app.services.rate_limit import TokenBucket
+from app.services.fetch_cache import cache as fetch_cache
+
+# ytmusicapi and requests are blocking — they run on this pool so imports never stall the event loop
+POOL_SIZE = int(os.getenv("UPSTREAM_THREADS", "8"))
+TIMEOUT = float(os.getenv("UPSTREAM_TIMEOUT", "20"))
+YTMUSIC_CONCURRENCY = int(os.getenv("YTMUSIC_CONCURRENCY", "4"))
+GENIUS_CONCURRENCY = int(os.getenv("GENIUS_CONCURRENCY", "2"))
+
+_pool = ThreadPoolExecutor(max_workers=POOL_SIZE, thread_name_prefix="upstream")
+
+
+class Upstream:
+    """Blocking calls to one service, run on the shared pool.
+
+    At most `concurrency` calls are in flight, each paced by the service's token bucket
+    and abandoned with TimeoutError after `timeout` seconds. The HTTP session also has
+    that timeout, so an abandoned call frees its thread soon after.
+    """
+
+    def __init__(self, name: str, concurrency: int, limiter: TokenBucket, timeout: float = TIMEOUT):
+        self.name = name
+        self.limiter = limiter
+        self.timeout = timeout
+        self.session = requests.Session()
+        self.session.request = partial(self.session.request, timeout=timeout)
+        self._slots = asyncio.Semaphore(concurrency)
+
+    async def call(self, fn, *args, **kwargs):
+        async with self._slots:
+            await self.limiter.acquire()
+            loop = asyncio.get_running_loop()
+            try:
+                return await asyncio.wait_for(loop.run_in_executor(_pool, partial(fn, *args, **kwargs)), self.timeout)
+            except asyncio.TimeoutError:
+                raise TimeoutError(f"{self.name} call timed out after {self.timeout:g}s") from None
+
+    async def get(self, url: str, **kwargs) -> requests.Response:
+        return await self.call(self.session.get, url, **kwargs)
+
+
+ytmusic = Upstream("YT Music", YTMUSIC_CONCURRENCY, rate_limit.ytmusic)
+genius = Upstream("Genius", GENIUS_CONCURRENCY, rate_limit.genius)
+
+
+class AsyncYTMusic:
+    """The few YTMusic methods we use, as coroutines running through the `ytmusic` upstream.
+
+    Responses go through the on-disk fetch cache; a watch playlist without a lyrics id
+    counts as a negative result.
+    """
+
+    def __init__(self, upstream: Upstream = ytmusic):
+        self._upstream = upstream
+        self._client = YTMusic(requests_session=upstream.session)
+
+    async def search(self, query: str, filter: str | None = None, limit: int = 20) -> list[dict]:
+        return await fetch_cache.acached(
+            "search", (query, filter, limit),
+            lambda: self._upstream.call(self._client.search, query, filter=filter, limit=limit),
+        )
+
+    async def get_song(self, video_id: str) -> dict:
+        return await fetch_cache.acached("song", (video_id,), lambda: self._upstream.call(self._client.get_song, video_id))
+
+    async def get_watch_playlist(self, video_id: str) -> dict:
+        return await fetch_cache.acached(
+            "watch", (video_id,), lambda: self._upstream.call(self._client.get_watch_playlist, videoId=video_id),
+            negative=lambda watch: not watch.get("lyrics"),
+        )
+
+    async def get_lyrics(self, browse_id: str) -> dict | None:
+        return await fetch_cache.acached(
+            "lyrics", (browse_id,), lambda: self._upstream.call(self._client.get_lyrics, browse_id),
+            negative=lambda lyrics: not (lyrics and lyrics.get("lyrics")),
+        )
+
+
+yt = AsyncYTMusic()
@@ -1,16 +1,15 @@
-from ytmusicapi import YTMusic
 from langdetect import detect, DetectorFactory
 DetectorFactory.seed = 0  # deterministic results
 from sqlalchemy import select
 from sqlalchemy.ext.asyncio import AsyncSession
-from app.models import Song, Lyric
+from app.models import Song
 from app.schemas import SongSearchResult
+from app.services.bulk_import_service import FetchedSong, store_song
+from app.services.upstream import yt
 
-yt = YTMusic()
 
-
-def search_songs(query: str) -> list[SongSearchResult]:
-    results = yt.search(query, filter="songs", limit=10)
+async def search_songs(query: str) -> list[SongSearchResult]:
+    results = await yt.search(query, filter="songs", limit=10)
     out = []
     for r in results:
         artists = ", ".join(a["name"] for a in r.get("artists", []))
@@ -26,14 +25,14 @@ def search_songs(query: str) -> list[SongSearchResult]:
     return out
 
 
-async def import_song(video_id: str, db: AsyncSession, language_override: str | None = None) -> Song:
+async def import_song(video_id: str, db: AsyncSession, language_override: str | None = None) -> tuple[int, FetchedSong]:
     # Check duplicate
     existing = await db.execute(select(Song).where(Song.yt_video_id == video_id))
     if existing.scalar_one_or_none():
         raise ValueError("Song already imported")
 
     # Get song metadata
-    song_data = yt.get_song(video_id)
+    song_data = await yt.get_song(video_id)
     details = song_data.get("videoDetails", {})
     title = details.get("title", "Unknown")
     artist = details.get("author", "Unknown")
@@ -41,12 +40,12 @@ async def import_song(video_id: str, db: AsyncSession, language_override: str |
     thumbnail_url = thumbs[-1]["url"] if thumbs else None
 
     # Get lyrics via watch playlist
-    watch = yt.get_watch_playlist(videoId=video_id)
+    watch = await yt.get_watch_playlist(video_id)
     lyrics_browse_id = watch.get("lyrics")
     if not lyrics_browse_id:
         raise LookupError("No lyrics available for this song")
 
-    lyrics_data = yt.get_lyrics(lyrics_browse_id)
+    lyrics_data = await yt.get_lyrics(lyrics_browse_id)
     if not lyrics_data or not lyrics_data.get("lyrics"):
         raise LookupError("No lyrics available for this song")
 
@@ -63,23 +62,9 @@ async def import_song(video_id: str, db: AsyncSession, language_override: str |
     else:
         language = _detect_language(lines)
 
-    # Persist
-    song = Song(
-        title=title,
-        artist=artist,
-        yt_video_id=video_id,
-        thumbnail_url=thumbnail_url,
-        language=language,
-    )
-    db.add(song)
-    await db.flush()
-
-    for i, text in enumerate(lines):
-        db.add(Lyric(song_id=song.id, line_number=i, text=text))
-
-    await db.commit()
-    await db.refresh(song)
-    return song, len(lines)
+    # Persist song, lyrics and title variants in one statement
+    fetched = FetchedSong(video_id, title, artist, thumbnail_url, lines, language)
+    return await store_song(fetched, db), fetched
 
 
 def _detect_language(lines: list[str]) -> str:
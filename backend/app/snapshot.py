@@ -0,0 +1,149 @@
+"""Read-only SQLite snapshot of the playable catalog, for serving gameplay without Postgres.
+
+Usage: python -m app.snapshot export catalog.sqlite      # write a snapshot from DATABASE_URL
+       python -m app.snapshot replay scores.spool.jsonl   # write spooled score events to DATABASE_URL
+
+With SNAPSHOT_PATH set, the API serves /game/challenge, /game/challenges/batch, /game/guess,
+/game/hint, /game/reveal, /game/autocomplete and /game/languages from the file. Score events are
+forwarded to DATABASE_URL through the write-behind buffer when it is set, else appended to
+SCORE_SPOOL_PATH for a later replay.
+"""
+
+import asyncio
+import json
+import os
+import sqlite3
+import sys
+import time
+from pathlib import Path
+
+SNAPSHOT_PATH = os.getenv("SNAPSHOT_PATH", "")
+MMAP_BYTES = int(os.getenv("SNAPSHOT_MMAP_MB", "256")) * 1024 * 1024
+FORMAT_VERSION = 1
+
+SCHEMA = """
+CREATE TABLE challenges (
+    challenge_id INTEGER PRIMARY KEY, song_id INTEGER NOT NULL, language TEXT, year INTEGER,
+    lines TEXT NOT NULL, before TEXT NOT NULL, after TEXT NOT NULL,
+    title TEXT NOT NULL, artist TEXT NOT NULL, album TEXT, thumbnail_url TEXT
+);
+CREATE TABLE songs (id INTEGER PRIMARY KEY, title TEXT NOT NULL, artist TEXT NOT NULL, language TEXT);
+CREATE TABLE title_variants (song_id INTEGER NOT NULL, variant TEXT NOT NULL);
+CREATE TABLE meta (key TEXT PRIMARY KEY, value TEXT NOT NULL);
+"""
+
+
+class Snapshot:
+    """Immutable, memory-mapped catalog file; every lookup is a primary-key or full-table read."""
+
+    def __init__(self, path: str):
+        self.path = path
+        self._conn = sqlite3.connect(f"file:{path}?mode=ro&immutable=1", uri=True, check_same_thread=False)
+        self._conn.execute(f"PRAGMA mmap_size = {MMAP_BYTES}")
+        meta = dict(self._conn.execute("SELECT key, value FROM meta"))
+        if int(meta.get("format", 0)) != FORMAT_VERSION:
+            raise RuntimeError(f"{path}: snapshot format {meta.get('format')}, expected {FORMAT_VERSION}")
+        self.exported_at = meta.get("exported_at")
+
+    def sampler_rows(self) -> list[tuple[int, str | None, int | None]]:
+        """(challenge_id, language, year) for every challenge — what the sampler builds from."""
+        return self._conn.execute("SELECT challenge_id, language, year FROM challenges").fetchall()
+
+    def challenge(self, challenge_id: int) -> dict | None:
+        row = self._conn.execute(
+            "SELECT challenge_id, song_id, lines, before, after, title, artist, album, thumbnail_url "
+            "FROM challenges WHERE challenge_id = ?", (challenge_id,),
+        ).fetchone()
+        if row is None:
+            return None
+        cid, song_id, lines, before, after, title, artist, album, thumbnail_url = row
+        return dict(challenge_id=cid, song_id=song_id, lines=tuple(json.loads(lines)), before=tuple(json.loads(before)),
+                    after=tuple(json.loads(after)), title=title, artist=artist, album=album, thumbnail_url=thumbnail_url)
+
+    def songs(self) -> list[tuple[int, str, str, str | None]]:
+        return self._conn.execute("SELECT id, title, artist, language FROM songs ORDER BY id").fetchall()
+
+    def variants(self) -> list[tuple[int, str]]:
+        return self._conn.execute("SELECT song_id, variant FROM title_variants").fetchall()
+
+    def languages(self) -> list[str]:
+        rows = self._conn.execute("SELECT DISTINCT language FROM songs WHERE language IS NOT NULL ORDER BY language")
+        return [r[0] for r in rows]
+
+
+snapshot = Snapshot(SNAPSHOT_PATH) if SNAPSHOT_PATH else None
+
+
+# --- Export / replay (run against Postgres) ---
+
+async def export(path: str):
+    from sqlalchemy import select
+    from app.db import async_session, engine
+    from app.models import Song, Challenge, ChallengeContext, SongTitleVariant
+    from app.services.challenge_cache import cache as challenge_cache
+
+    async with async_session() as db:
+        # Challenges from before contexts existed get theirs built first
+        missing = await db.execute(
+            select(Challenge.id).outerjoin(ChallengeContext, ChallengeContext.challenge_id == Challenge.id)
+            .where(Challenge.is_active == True, ChallengeContext.challenge_id.is_(None))
+        )
+        for (challenge_id,) in missing.all():
+            await challenge_cache.get(challenge_id, db)
+
+        challenges = (await db.execute(
+            select(ChallengeContext, Song.language, Song.year)
+            .join(Challenge, Challenge.id == ChallengeContext.challenge_id)
+            .join(Song, Song.id == Challenge.song_id)
+            .where(Challenge.is_active == True)
+        )).all()
+        song_ids = {ctx.song_id for ctx, _, _ in challenges}
+        songs = (await db.execute(
+            select(Song.id, Song.title, Song.artist, Song.language).where(Song.id.in_(song_ids))
+        )).all() if song_ids else []
+        variants = (await db.execute(
+            select(SongTitleVariant.song_id, SongTitleVariant.variant).where(SongTitleVariant.song_id.in_(song_ids))
+        )).all() if song_ids else []
+    await engine.dispose()
+
+    # Build beside the target and swap it in, so readers never see a half-written file
+    tmp = Path(f"{path}.tmp")
+    tmp.unlink(missing_ok=True)
+    conn = sqlite3.connect(tmp)
+    conn.executescript(SCHEMA)
+    conn.executemany(
+        "INSERT INTO challenges VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+        [(ctx.challenge_id, ctx.song_id, language, year, json.dumps(ctx.lines), json.dumps(ctx.before),
+          json.dumps(ctx.after), ctx.title, ctx.artist, ctx.album, ctx.thumbnail_url)
+         for ctx, language, year in challenges],
+    )
+    conn.executemany("INSERT INTO songs VALUES (?, ?, ?, ?)", [tuple(r) for r in songs])
+    conn.executemany("INSERT INTO title_variants VALUES (?, ?)", [tuple(r) for r in variants])
+    conn.executemany("INSERT INTO meta VALUES (?, ?)", [
+        ("format", str(FORMAT_VERSION)), ("exported_at", time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime())),
+    ])
+    conn.execute("CREATE INDEX idx_title_variants_song ON title_variants (song_id)")
+    conn.commit()
+    conn.execute("VACUUM")
+    conn.close()
+    os.replace(tmp, path)
+    print(f"Exported {len(challenges)} challenges, {len(songs)} songs to {path}")
+
+
+async def replay(spool_path: str):
+    from app.db import async_session, engine
+    from app.services.score_service import FLUSH_EVENTS, write_batch
+
+    with open(spool_path) as f:
+        events = [tuple(json.loads(line)) for line in f if line.strip()]
+    for i in range(0, len(events), FLUSH_EVENTS):
+        async with async_session() as db:
+            await write_batch(db, events[i:i + FLUSH_EVENTS])
+    await engine.dispose()
+    print(f"Replayed {len(events)} score events from {spool_path}")
+
+
+if __name__ == "__main__":
+    if len(sys.argv) != 3 or sys.argv[1] not in ("export", "replay"):
+        sys.exit(__doc__)
+    asyncio.run(export(sys.argv[2]) if sys.argv[1] == "export" else replay(sys.argv[2]))
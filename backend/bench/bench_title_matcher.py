@@ -0,0 +1,77 @@
+"""
+Micro-benchmark: guess checks per second, difflib baseline vs title_matcher.
+Uses the scraped catalogs in webscraper/data as titles.
+Usage: python -m bench.bench_title_matcher   (from backend/)
+"""
+import json
+import random
+import re
+import time
+import unicodedata
+from difflib import SequenceMatcher
+from pathlib import Path
+from app.services import title_matcher
+
+DATA_DIR = Path(__file__).parent.parent / "webscraper" / "data"
+
+
+def _baseline_normalize(text: str) -> str:
+    text = unicodedata.normalize("NFKD", text).lower()
+    text = re.sub(r"[^\w\s]", "", text)
+    return re.sub(r"\s+", " ", text).strip()
+
+
+def baseline(guess: str, title: str) -> float:
+    return SequenceMatcher(None, _baseline_normalize(guess), _baseline_normalize(title)).ratio()
+
+
+def _typo(s: str) -> str:
+    if len(s) < 3:
+        return s
+    i = random.randrange(len(s))
+    return s[:i] + s[i + 1:]
+
+
+def make_guesses(titles: list[str], n: int) -> list[tuple[int, str, str]]:
+    guesses = []
+    for _ in range(n):
+        cid = random.randrange(len(titles))
+        title = titles[cid]
+        kind = random.random()
+        if kind < 0.3:
+            guess = title.split("(")[0].strip()
+        elif kind < 0.6:
+            guess = _typo(title.split("(")[0].strip())
+        elif kind < 0.8:
+            guess = random.choice(titles)
+        else:
+            guess = random.choice(["idk", "tum hi ho", "kesariya", "naa praanama", "ringa ringa"])
+        guesses.append((cid, guess, title))
+    return guesses
+
+
+def run(label: str, fn, guesses) -> float:
+    start = time.perf_counter()
+    for cid, guess, title in guesses:
+        fn(cid, guess, title)
+    rate = len(guesses) / (time.perf_counter() - start)
+    print(f"{label:<34} {rate:>12,.0f} guesses/s")
+    return rate
+
+
+if __name__ == "__main__":
+    random.seed(0)
+    titles = [s["title"] for f in sorted(DATA_DIR.glob("*_songs.json")) for s in json.loads(f.read_text())]
+    guesses = make_guesses(titles, 20000)
+
+    # Thresholds must agree with the old matcher on (nearly) every guess
+    def bucket(s):
+        return 2 if s >= title_matcher.HIGH else 1 if s >= title_matcher.LOW else 0
+    agree = sum(bucket(baseline(g, t)) == bucket(title_matcher.similarity(g, t)) for _, g, t in guesses)
+    print(f"threshold agreement: {agree / len(guesses):.2%}")
+
+    before = run("difflib SequenceMatcher", lambda cid, g, t: baseline(g, t), guesses)
+    after = run("title_matcher (no result cache)", lambda cid, g, t: title_matcher.similarity(g, t), guesses)
+    spam = guesses[:200] * 100  # same few guesses repeated, as from a spamming client
+    run("title_matcher (repeated guesses)", lambda cid, g, t: title_matcher.score(g, t, cid), spam)
+    print(f"speedup: {after / before:.1f}x")
@@ -1,5 +1,6 @@
 -- Lyricle Database Schema
 -- PostgreSQL — run against 'lyricguess' database
+-- Applied by `python -m app.migrate` along with the numbered migrations that follow it
 
 CREATE TABLE IF NOT EXISTS songs (
     id SERIAL PRIMARY KEY,
@@ -9,10 +10,19 @@ CREATE TABLE IF NOT EXISTS songs (
     album TEXT,
     thumbnail_url TEXT,
     language VARCHAR(10),
+    year INTEGER,
     created_at TIMESTAMPTZ DEFAULT NOW()
 );
+ALTER TABLE songs ADD COLUMN IF NOT EXISTS year INTEGER;
 CREATE INDEX IF NOT EXISTS idx_songs_language ON songs(language);
 
+CREATE TABLE IF NOT EXISTS song_title_variants (
+    id SERIAL PRIMARY KEY,
+    song_id INTEGER NOT NULL REFERENCES songs(id) ON DELETE CASCADE,
+    variant TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_song_title_variants_song_id ON song_title_variants(song_id);
+
 CREATE TABLE IF NOT EXISTS lyrics (
     id SERIAL PRIMARY KEY,
     song_id INTEGER NOT NULL REFERENCES songs(id) ON DELETE CASCADE,
@@ -29,6 +39,29 @@ CREATE TABLE IF NOT EXISTS challenges (
     created_at TIMESTAMPTZ DEFAULT NOW()
 );
 
+-- Denormalized gameplay payload per challenge (snippet, hint lines, reveal metadata)
+CREATE TABLE IF NOT EXISTS challenge_contexts (
+    challenge_id INTEGER PRIMARY KEY REFERENCES challenges(id) ON DELETE CASCADE,
+    song_id INTEGER NOT NULL,
+    lines TEXT[] NOT NULL,
+    before TEXT[] NOT NULL,
+    after TEXT[] NOT NULL,
+    title TEXT NOT NULL,
+    artist TEXT NOT NULL,
+    album TEXT,
+    thumbnail_url TEXT
+);
+
+-- One persisted puzzle set per UTC day and language ('all' = every language)
+CREATE TABLE IF NOT EXISTS daily_challenges (
+    day DATE NOT NULL,
+    language VARCHAR(10) NOT NULL,
+    payload TEXT NOT NULL,
+    etag VARCHAR(64) NOT NULL,
+    created_at TIMESTAMPTZ DEFAULT NOW(),
+    PRIMARY KEY (day, language)
+);
+
 CREATE TABLE IF NOT EXISTS users (
     id SERIAL PRIMARY KEY,
     username VARCHAR(32) UNIQUE NOT NULL,
@@ -51,6 +84,29 @@ CREATE TABLE IF NOT EXISTS scores (
     created_at TIMESTAMPTZ DEFAULT NOW()
 );
 CREATE INDEX IF NOT EXISTS idx_scores_user_id ON scores(user_id);
+-- One row per (user, challenge); older installs may hold duplicates, keep the best-scoring one
+DELETE FROM scores s USING scores t
+WHERE s.user_id = t.user_id AND s.challenge_id = t.challenge_id AND (s.points, s.id) < (t.points, t.id);
+CREATE UNIQUE INDEX IF NOT EXISTS uq_scores_user_challenge ON scores(user_id, challenge_id);
+
+-- Per-user running totals, kept in step with every score write (rebuild: POST /admin/leaderboard/rebuild)
+CREATE TABLE IF NOT EXISTS user_totals (
+    user_id INTEGER PRIMARY KEY REFERENCES users(id) ON DELETE CASCADE,
+    total_points INTEGER NOT NULL DEFAULT 0,
+    games_played INTEGER NOT NULL DEFAULT 0
+);
+CREATE INDEX IF NOT EXISTS idx_user_totals_points ON user_totals(total_points DESC, user_id);
+
+-- Daily ("2026-10-18"), weekly ("2026-W42") and all-time buckets per language, bucketed by the score's created_at
+CREATE TABLE IF NOT EXISTS score_rollups (
+    period VARCHAR(10) NOT NULL,
+    language VARCHAR(10) NOT NULL,
+    user_id INTEGER NOT NULL REFERENCES users(id) ON DELETE CASCADE,
+    points INTEGER NOT NULL DEFAULT 0,
+    games_played INTEGER NOT NULL DEFAULT 0,
+    PRIMARY KEY (period, language, user_id)
+);
+CREATE INDEX IF NOT EXISTS idx_score_rollups_rank ON score_rollups(period, language, points DESC, user_id);
 
 CREATE TABLE IF NOT EXISTS issues (
     id SERIAL PRIMARY KEY,
@@ -0,0 +1,14 @@
+-- Indexes for the lookups every gameplay request and import makes
+
+-- Snippet / hint windows: lyrics of one song by line range
+CREATE INDEX IF NOT EXISTS idx_lyrics_song_line ON lyrics(song_id, line_number);
+
+-- Active challenges, optionally of one song (sampler rebuilds, admin filters)
+CREATE INDEX IF NOT EXISTS idx_challenges_active_song ON challenges(is_active, song_id);
+
+-- (user_id, challenge_id) is already covered by uq_scores_user_challenge;
+-- this one serves per-challenge lookups and ON DELETE CASCADE from challenges
+CREATE INDEX IF NOT EXISTS idx_scores_challenge_id ON scores(challenge_id);
+
+-- Case-insensitive duplicate check in bulk import
+CREATE INDEX IF NOT EXISTS idx_songs_title_artist_lower ON songs(lower(title), lower(artist));
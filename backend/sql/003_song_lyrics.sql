@@ -0,0 +1,17 @@
+-- One row per song with all its lyric lines, replacing one row per line.
+-- Line n (0-based, as before) is lines[n + 1]; arrays over ~2 kB are compressed by TOAST.
+CREATE TABLE IF NOT EXISTS song_lyrics (
+    song_id INTEGER PRIMARY KEY REFERENCES songs(id) ON DELETE CASCADE,
+    lines TEXT[] NOT NULL
+);
+
+-- Gaps in line numbering (none are expected) become empty lines so positions are kept
+INSERT INTO song_lyrics (song_id, lines)
+SELECT s.song_id, array_agg(coalesce(l.text, '') ORDER BY n.n)
+FROM (SELECT song_id, max(line_number) AS last FROM lyrics GROUP BY song_id) s
+CROSS JOIN LATERAL generate_series(0, s.last) AS n(n)
+LEFT JOIN lyrics l ON l.song_id = s.song_id AND l.line_number = n.n
+GROUP BY s.song_id
+ON CONFLICT (song_id) DO NOTHING;
+
+DROP TABLE lyrics;
@@ -0,0 +1,14 @@
+-- One challenge per (song, line range), so bulk inserts can use ON CONFLICT DO NOTHING
+-- instead of a duplicate-check query per candidate window.
+
+-- Both create paths already checked for duplicates; drop any a race let through, keeping the oldest.
+-- Scores on a dropped duplicate go with it — run POST /admin/leaderboard/rebuild if this deletes rows.
+DELETE FROM challenges c
+USING challenges keep
+WHERE keep.song_id = c.song_id
+  AND keep.start_line = c.start_line
+  AND keep.end_line = c.end_line
+  AND keep.id < c.id;
+
+-- Fresh databases already have it from the model; IF NOT EXISTS skips the index backing that constraint
+CREATE UNIQUE INDEX IF NOT EXISTS uq_challenges_song_lines ON challenges(song_id, start_line, end_line);
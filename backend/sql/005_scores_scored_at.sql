@@ -0,0 +1,10 @@
+-- When a score's points were earned: the correct guess, else the row's creation.
+-- Day/week leaderboard buckets follow it for live writes, retractions and rebuilds alike.
+ALTER TABLE scores ADD COLUMN IF NOT EXISTS scored_at TIMESTAMPTZ;
+UPDATE scores SET scored_at = created_at WHERE scored_at IS NULL;
+ALTER TABLE scores ALTER COLUMN scored_at SET DEFAULT NOW(), ALTER COLUMN scored_at SET NOT NULL;
+
+-- Existing buckets were filled by other rules; emptying them makes the next startup
+-- rebuild them from scores (leaderboard_service.ensure_totals). If old workers wrote
+-- scores in between, run POST /admin/leaderboard/rebuild once the new code is live.
+TRUNCATE score_rollups;
@@ -0,0 +1,49 @@
+import json
+from app.migrate import HOT_QUERIES, ORDER_ONLY, check_plan
+
+# EXPLAIN (FORMAT JSON) output as Postgres returns it, trimmed to the keys check_plan reads
+SCORE_ROW = json.loads("""[{"Plan": {
+    "Node Type": "Index Scan", "Relation Name": "scores", "Index Name": "uq_scores_user_challenge",
+    "Index Cond": "((user_id = 1) AND (challenge_id = 1))"}}]""")
+
+SEQ_SCAN = json.loads("""[{"Plan": {
+    "Node Type": "Seq Scan", "Relation Name": "scores", "Filter": "(challenge_id = 1)"}}]""")
+
+FULL_INDEX_WALK = json.loads("""[{"Plan": {
+    "Node Type": "Index Scan", "Relation Name": "scores", "Index Name": "uq_scores_user_challenge",
+    "Filter": "(challenge_id = 1)"}}]""")
+
+BITMAP = json.loads("""[{"Plan": {
+    "Node Type": "Bitmap Heap Scan", "Relation Name": "song_title_variants",
+    "Recheck Cond": "(song_id = 1)",
+    "Plans": [{"Node Type": "Bitmap Index Scan", "Index Name": "ix_song_title_variants_song_id",
+               "Index Cond": "(song_id = 1)"}]}}]""")
+
+LEADERBOARD_TOP = json.loads("""[{"Plan": {
+    "Node Type": "Limit",
+    "Plans": [{"Node Type": "Index Only Scan", "Relation Name": "user_totals",
+               "Index Name": "idx_user_totals_points"}]}}]""")
+
+
+def test_index_scan_with_cond_passes():
+    assert check_plan(SCORE_ROW[0]["Plan"], HOT_QUERIES["score row"][1]) is None
+
+
+def test_seq_scan_fails():
+    assert check_plan(SEQ_SCAN[0]["Plan"], HOT_QUERIES["scores of a challenge"][1]) == "seq scan on scores"
+
+
+def test_wrong_index_without_cond_fails():
+    problem = check_plan(FULL_INDEX_WALK[0]["Plan"], HOT_QUERIES["scores of a challenge"][1])
+    assert problem == "uses uq_scores_user_challenge without Index Cond"
+
+
+def test_bitmap_index_scan_under_heap_scan_passes():
+    assert check_plan(BITMAP[0]["Plan"], HOT_QUERIES["title variants"][1]) is None
+
+
+def test_order_only_query_needs_no_cond():
+    indexes = HOT_QUERIES["leaderboard top"][1]
+    assert "leaderboard top" in ORDER_ONLY
+    assert check_plan(LEADERBOARD_TOP[0]["Plan"], indexes, order_only=True) is None
+    assert check_plan(LEADERBOARD_TOP[0]["Plan"], indexes) == "uses idx_user_totals_points without Index Cond"
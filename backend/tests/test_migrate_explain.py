@@ -0,0 +1,23 @@
+"""Plans of the hot queries against a real database. Needs DATABASE_URL pointing at a migrated
+Postgres (python -m app.migrate); skipped otherwise."""
+import os
+import pytest
+from sqlalchemy import create_engine
+from app.init_db import sync_url
+from app.migrate import HOT_QUERIES, plan_problems
+
+pytestmark = pytest.mark.skipif(not os.getenv("DATABASE_URL"), reason="DATABASE_URL not set")
+
+
+@pytest.fixture(scope="module")
+def problems():
+    engine = create_engine(sync_url())
+    with engine.connect() as conn:
+        found = plan_problems(conn)
+    engine.dispose()
+    return found
+
+
+@pytest.mark.parametrize("name", list(HOT_QUERIES))
+def test_hot_query_uses_its_index(problems, name):
+    assert problems[name] is None, f"{name}: {problems[name]}; expected {' or '.join(HOT_QUERIES[name][1])}"
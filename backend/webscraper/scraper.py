@@ -4,10 +4,13 @@ Discovers songs, fetches lyrics, saves to JSON.
 Usage: python scraper.py --language te --count 500
        python scraper.py --language hi --count 100
 """
-import argparse, json, os, time, re, random
+import argparse, json, os, sys, time, re, random
 from pathlib import Path
 from ytmusicapi import YTMusic
 
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+from app.services.fetch_cache import cache as fetch_cache  # same cache file as the API's importer
+
 DATA_DIR = Path(__file__).parent / "data"
 DATA_DIR.mkdir(exist_ok=True)
 
@@ -107,7 +110,7 @@ def extract_year(song: dict) -> int | None:
 def get_song_year(video_id: str) -> int | None:
     """Try to get year from detailed song info."""
     try:
-        info = yt.get_song(video_id)
+        info = fetch_cache.cached("song", (video_id,), lambda: yt.get_song(video_id))
         details = info.get("videoDetails", {})
         # Try microformat
         micro = info.get("microformat", {}).get("microformatDataRenderer", {})
@@ -125,11 +128,13 @@ def get_song_year(video_id: str) -> int | None:
 def fetch_lyrics(video_id: str) -> str | None:
     """Fetch lyrics for a song via ytmusicapi."""
     try:
-        watch = yt.get_watch_playlist(video_id)
+        watch = fetch_cache.cached("watch", (video_id,), lambda: yt.get_watch_playlist(video_id),
+                                   negative=lambda w: not w.get("lyrics"))
         lyrics_id = watch.get("lyrics")
         if not lyrics_id:
             return None
-        lyrics_data = yt.get_lyrics(lyrics_id)
+        lyrics_data = fetch_cache.cached("lyrics", (lyrics_id,), lambda: yt.get_lyrics(lyrics_id),
+                                         negative=lambda l: not (l and l.get("lyrics")))
         if lyrics_data and lyrics_data.get("lyrics"):
             return lyrics_data["lyrics"]
     except Exception:
@@ -167,7 +172,7 @@ def is_garbage(text: str) -> bool:
 def search_songs(query: str, limit: int = 20) -> list[dict]:
     """Search YTMusic for songs."""
     try:
-        results = yt.search(query, filter="songs", limit=limit)
+        results = fetch_cache.cached("search", (query, "songs", limit), lambda: yt.search(query, filter="songs", limit=limit))
         return results
     except Exception as e:
         print(f"  Search error for '{query}': {e}")
@@ -20,6 +20,7 @@ function adminHeaders(): HeadersInit {
 
 export interface GameChallenge { challenge_id: number; lines: string[]; }
 export interface GuessResponse { correct: boolean; message: string; near_match: boolean; suggestion: string | null; }
+export interface AutocompleteSuggestion { title: string; artist: string; }
 export interface HintResponse { challenge_id: number; before: string[]; after: string[]; }
 export interface RevealResponse { title: string; artist: string; album: string | null; thumbnail_url: string | null; platform_links: Record<string, string>; }
 
@@ -31,19 +32,30 @@ export interface LyricLine { line_number: number; text: string; }
 export interface ChallengeOut { id: number; song_id: number; song_title: string; song_artist: string; start_line: number; end_line: number; is_active: boolean; preview: string; }
 
 export interface UserOut { id: number; username: string; first_name: string; last_name: string; avatar_url?: string | null; }
+export type LeaderboardPeriod = "day" | "week" | "all";
 export interface LeaderboardEntry { user_id: number; username: string; first_name: string; last_name: string; avatar_url: string | null; total_points: number; games_played: number; }
 export interface IssueOut { id: number; user_id: number; username: string; subject: string; message: string; status: string; created_at: string; }
 export interface BulkImportJob { id: number; source: string; language: string | null; requested_count: number; challenges_per_song: number; year_from: number | null; year_to: number | null; search_query: string | null; status: string; total_found: number; imported: number; skipped: number; failed: number; challenges_created: number; log: string | null; created_at: string; }
 
 export const api = {
   // Game
-  getChallenge: (language?: string, exclude?: number[]) => {
+  getChallenge: (language?: string, user_id?: number, exclude?: number[]) => {
     const params = new URLSearchParams();
     if (language) params.set("language", language);
+    if (user_id) params.set("user_id", String(user_id));
     if (exclude?.length) params.set("exclude", exclude.join(","));
     const qs = params.toString();
     return request<GameChallenge>(`/game/challenge${qs ? `?${qs}` : ""}`);
   },
+  getChallengeBatch: (n: number, language?: string, user_id?: number, exclude?: number[]) => {
+    const params = new URLSearchParams({ n: String(n) });
+    if (language) params.set("language", language);
+    if (user_id) params.set("user_id", String(user_id));
+    if (exclude?.length) params.set("exclude", exclude.join(","));
+    return request<GameChallenge[]>(`/game/challenges/batch?${params}`);
+  },
+  autocomplete: (q: string, language?: string) =>
+    request<AutocompleteSuggestion[]>(`/game/autocomplete?q=${encodeURIComponent(q)}${language ? `&language=${language}` : ""}`),
   guess: (challenge_id: number, guess: string, user_id?: number) =>
     request<GuessResponse>("/game/guess", { method: "POST", headers: { "Content-Type": "application/json" }, body: JSON.stringify({ challenge_id, guess, user_id }) }),
   getHint: (id: number, user_id?: number) => request<HintResponse>(`/game/hint/${id}${user_id ? `?user_id=${user_id}` : ""}`),
@@ -54,7 +66,10 @@ export const api = {
   importSong: (video_id: string, language?: string) => request<{ id: number; title: string; artist: string; lyric_count: number }>("/admin/songs/import", { method: "POST", headers: adminHeaders(), body: JSON.stringify({ video_id, language }) }),
   listSongs: () => request<SongOut[]>("/admin/songs", { headers: adminHeaders() }),
   getSongLyrics: (id: number) => request<LyricLine[]>(`/admin/songs/${id}/lyrics`, { headers: adminHeaders() }),
-  listChallenges: () => request<ChallengeOut[]>("/admin/challenges", { headers: adminHeaders() }),
+  listChallenges: (filters: { song_id?: number; language?: string; is_active?: boolean } = {}) => {
+    const qs = new URLSearchParams(Object.entries(filters).filter(([, v]) => v !== undefined).map(([k, v]) => [k, String(v)])).toString();
+    return request<ChallengeOut[]>(`/admin/challenges${qs ? `?${qs}` : ""}`, { headers: adminHeaders() });
+  },
   createChallenge: (song_id: number, start_line: number, end_line: number) =>
     request<ChallengeOut>("/admin/challenges", { method: "POST", headers: adminHeaders(), body: JSON.stringify({ song_id, start_line, end_line }) }),
   updateChallenge: (id: number, data: { is_active?: boolean; start_line?: number; end_line?: number }) =>
@@ -75,7 +90,8 @@ export const api = {
     request<UserOut>("/auth/google", { method: "POST", headers: { "Content-Type": "application/json" }, body: JSON.stringify({ credential }) }),
 
   // Leaderboard
-  getLeaderboard: () => request<LeaderboardEntry[]>("/leaderboard"),
+  getLeaderboard: (period: LeaderboardPeriod = "all", language?: string) =>
+    request<LeaderboardEntry[]>(`/leaderboard?period=${period}${language ? `&language=${language}` : ""}`),
 
   // Languages
   getLanguages: () => request<string[]>("/game/languages"),
@@ -1,7 +1,16 @@
-import { useState } from "react";
+import { useState, useEffect } from "react";
+import { api, type AutocompleteSuggestion } from "../api/client";
 
-export default function GuessInput({ onSubmit }: { onSubmit: (guess: string) => void }) {
+export default function GuessInput({ onSubmit, language }: { onSubmit: (guess: string) => void; language?: string }) {
   const [value, setValue] = useState("");
+  const [suggestions, setSuggestions] = useState<AutocompleteSuggestion[]>([]);
+
+  useEffect(() => {
+    if (value.trim().length < 2) { setSuggestions([]); return; }
+    const t = setTimeout(() => { api.autocomplete(value.trim(), language).then(setSuggestions).catch(() => setSuggestions([])); }, 150);
+    return () => clearTimeout(t);
+  }, [value, language]);
+
   const handle = (e: React.FormEvent) => {
     e.preventDefault();
     if (!value.trim()) return;
@@ -10,8 +19,11 @@ export default function GuessInput({ onSubmit }: { onSubmit: (guess: string) =>
   };
   return (
     <form onSubmit={handle} className="flex gap-2">
-      <input value={value} onChange={e => setValue(e.target.value)} placeholder="Type your guess..."
+      <input value={value} onChange={e => setValue(e.target.value)} placeholder="Type your guess..." list="title-suggestions" autoComplete="off"
         className="flex-1 px-4 py-3 border border-input-bdr rounded-xl bg-card text-txt placeholder-muted outline-none focus:border-accent focus:ring-2 focus:ring-accent/20 transition-all text-base" />
+      <datalist id="title-suggestions">
+        {suggestions.map(s => <option key={`${s.title}|${s.artist}`} value={s.title}>{s.artist}</option>)}
+      </datalist>
       <button type="submit" className="px-6 py-3 bg-accent text-white rounded-xl font-medium hover:bg-accent-hover transition-colors">
         Guess
       </button>
@@ -8,6 +8,8 @@ import Snackbar from "../components/Snackbar";
 
 type State = "loading" | "playing" | "hinted" | "revealed" | "no-challenges";
 
+const PREFETCH = 10;
+
 export default function GamePage({ userId, language }: { userId?: number; language?: string }) {
   const [state, setState] = useState<State>("loading");
   const [challenge, setChallenge] = useState<GameChallenge | null>(null);
@@ -17,17 +19,21 @@ export default function GamePage({ userId, language }: { userId?: number; langua
   const [suggestion, setSuggestion] = useState<GuessResponse | null>(null);
   const seenRef = useRef<number[]>([]);
 
+  const queueRef = useRef<GameChallenge[]>([]);
+
   const loadChallenge = useCallback(async () => {
     setState("loading"); setSnack(null); setHint(null); setReveal(null); setSuggestion(null);
     try {
-      const c = await api.getChallenge(language, seenRef.current);
+      // Prefetch a round at a time; the recent seen list goes along for everyone — signed-in players are also tracked server-side
+      if (!queueRef.current.length) queueRef.current = await api.getChallengeBatch(PREFETCH, language, userId, seenRef.current);
+      const c = queueRef.current.shift()!;
       setChallenge(c); setState("playing");
       seenRef.current = [...seenRef.current.slice(-30), c.challenge_id];
     }
     catch { setState("no-challenges"); }
-  }, [language]);
+  }, [language, userId]);
 
-  useEffect(() => { loadChallenge(); }, [loadChallenge]);
+  useEffect(() => { queueRef.current = []; loadChallenge(); }, [loadChallenge]);
 
   const handleCorrect = async () => {
     if (!challenge) return;
@@ -98,7 +104,7 @@ export default function GamePage({ userId, language }: { userId?: number; langua
 
           {state !== "revealed" ? (
             <div className="space-y-4">
-              <GuessInput onSubmit={handleGuess} />
+              <GuessInput onSubmit={handleGuess} language={language} />
               <div className="flex justify-center gap-4">
                 {state === "playing" && (
                   <button onClick={handleHint} className="text-sm text-muted hover:text-txt2 transition-colors">Need a hint?</button>
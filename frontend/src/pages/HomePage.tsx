@@ -3,7 +3,7 @@ import { api, type UserOut } from "../api/client";
 import UserRegistration from "../components/UserRegistration";
 import GamePage from "./GamePage";
 
-const LANG_NAMES: Record<string, string> = {
+export const LANG_NAMES: Record<string, string> = {
   en: "English", hi: "Hindi", te: "Telugu",
   // TODO: Add more languages later
   // es: "Spanish", fr: "French", de: "German", it: "Italian", pt: "Portuguese",
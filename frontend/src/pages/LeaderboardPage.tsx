@@ -1,23 +1,46 @@
 import { useState, useEffect } from "react";
-import { api, type LeaderboardEntry } from "../api/client";
+import { api, type LeaderboardEntry, type LeaderboardPeriod } from "../api/client";
+import { LANG_NAMES } from "./HomePage";
+
+const PERIODS: [LeaderboardPeriod, string][] = [["day", "Today"], ["week", "This Week"], ["all", "All Time"]];
 
 export default function LeaderboardPage() {
   const [entries, setEntries] = useState<LeaderboardEntry[]>([]);
   const [loading, setLoading] = useState(true);
+  const [period, setPeriod] = useState<LeaderboardPeriod>("all");
+  const [languages, setLanguages] = useState<string[]>([]);
+  const [language, setLanguage] = useState<string>("");
 
-  useEffect(() => { api.getLeaderboard().then(setEntries).finally(() => setLoading(false)); }, []);
-
-  if (loading) return (
-    <div className="flex items-center justify-center min-h-[60vh]">
-      <div className="w-8 h-8 border-2 border-bdr border-t-accent rounded-full animate-spin" />
-    </div>
-  );
+  useEffect(() => { api.getLanguages().then(setLanguages).catch(() => {}); }, []);
+  useEffect(() => {
+    setLoading(true);
+    api.getLeaderboard(period, language || undefined).then(setEntries).finally(() => setLoading(false));
+  }, [period, language]);
 
   return (
     <div className="px-4 py-10">
       <div className="max-w-xl mx-auto space-y-6">
         <h1 className="text-xl font-semibold text-txt text-center">🏆 Leaderboard</h1>
-        {entries.length === 0 ? (
+        <div className="flex items-center justify-center gap-2">
+          {PERIODS.map(([p, label]) => (
+            <button key={p} onClick={() => setPeriod(p)}
+              className={`px-3 py-1.5 rounded-lg text-sm transition-colors ${period === p ? "bg-accent text-white" : "bg-card text-txt2 border border-bdr hover:bg-card-hover"}`}>
+              {label}
+            </button>
+          ))}
+          {languages.length > 1 && (
+            <select value={language} onChange={e => setLanguage(e.target.value)}
+              className="px-3 py-1.5 bg-card text-txt2 rounded-lg text-sm outline-none border border-bdr focus:border-accent transition-colors">
+              <option value="">All Languages</option>
+              {languages.filter(l => l in LANG_NAMES).map(l => <option key={l} value={l}>{LANG_NAMES[l]}</option>)}
+            </select>
+          )}
+        </div>
+        {loading ? (
+          <div className="flex items-center justify-center min-h-[30vh]">
+            <div className="w-8 h-8 border-2 border-bdr border-t-accent rounded-full animate-spin" />
+          </div>
+        ) : entries.length === 0 ? (
           <p className="text-muted text-center">No scores yet. Be the first to play!</p>
         ) : (
           <div className="bg-card rounded-2xl shadow-sm border border-bdr divide-y divide-bdr transition-colors">